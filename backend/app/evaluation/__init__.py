@@ -1,5 +1,6 @@
 from app.evaluation.eval_retriever import EvalRetriever
 from app.evaluation.eval_reranker import EvalReranker
+from app.evaluation.eval_candidate_budget import EvalCandidateBudget
 from app.evaluation.evaluator import Evaluator
 
-__all__ = ["EvalRetriever", "EvalReranker", "Evaluator"]
+__all__ = ["EvalRetriever", "EvalReranker", "EvalCandidateBudget", "Evaluator"]
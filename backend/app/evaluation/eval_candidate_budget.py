@@ -0,0 +1,94 @@
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from app.pydantic_models.data_model import DatasetRow, TransformedQuery
+from app.services.recommender.candidate_budget import CandidateBudget
+from app.services.reranker.base_reranker import BaseReranker
+from app.services.balancer.balancer import ResultBalancer
+from app.services.retriever.vector_search import retrieval_scores
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+class EvalCandidateBudget:
+    """
+    Evaluates the adaptive candidate budget against reranking every retrieved candidate:
+    the same candidates go through Reranker -> Balancer once in full and once cut to the
+    adaptive budget, and the rerank payload, rerank latency and Recall@K of both are compared.
+    When the budget keeps every candidate (e.g. the retriever reports no scores), the
+    query is reranked once and counted in both arms.
+    """
+
+    def __init__(
+        self,
+        retriever: BaseRetriever,
+        reranker: BaseReranker,
+        balancer: ResultBalancer,
+        candidate_budget: CandidateBudget,
+        dataset: List[DatasetRow],
+        transformed_queries: List[TransformedQuery],
+        log_func: Optional[Callable[[str], None]] = None
+    ):
+        self.retriever = retriever
+        self.reranker = reranker
+        self.balancer = balancer
+        self.candidate_budget = candidate_budget
+        self.dataset = dataset
+        self.transformed_queries = transformed_queries
+        self._log = log_func if log_func else print
+
+    def _recommend(self, transformed_query: TransformedQuery, candidates: List[Document]) -> Tuple[Set[str], float]:
+        """Recommended URLs and the rerank latency in milliseconds."""
+        start = time.perf_counter()
+        reranked_results = self.reranker.rerank(
+            transformed_query.rewritten_query,
+            candidates
+        )
+        rerank_ms = (time.perf_counter() - start) * 1000
+        balanced_docs = self.balancer.balance_selection(
+            reranked_results,
+            transformed_query.preferred_intent
+        )
+        return {doc.metadata.get("url", "") for doc in balanced_docs}, rerank_ms
+
+    def evaluate(self) -> Dict[str, float]:
+        totals = {
+            "full_recall": 0.0, "adaptive_recall": 0.0,
+            "full_candidates": 0.0, "adaptive_candidates": 0.0,
+            "full_rerank_ms": 0.0, "adaptive_rerank_ms": 0.0
+        }
+        unscored = 0
+        for idx, (row, transformed_query) in enumerate(zip(self.dataset, self.transformed_queries)):
+            ground_truth_urls = {self.normalize_url(url) for url in row.urls}
+
+            retrieved_tests = self.retriever.invoke(
+                transformed_query.rewritten_query
+            )
+            budget_tests = self.candidate_budget.select(retrieved_tests)
+            unscored += retrieval_scores(retrieved_tests) is None
+
+            full_result = self._recommend(transformed_query, retrieved_tests)
+            # A budget keeping every candidate would rerank the same payload again
+            budget_result = full_result if len(budget_tests) == len(retrieved_tests) else None
+            for arm, candidates in (("full", retrieved_tests), ("adaptive", budget_tests)):
+                recommended_urls, rerank_ms = (
+                    full_result if arm == "full" else budget_result or self._recommend(transformed_query, candidates)
+                )
+                recall_k = len(recommended_urls.intersection(ground_truth_urls)) / len(ground_truth_urls)
+                totals[f"{arm}_recall"] += recall_k
+                totals[f"{arm}_candidates"] += len(candidates)
+                totals[f"{arm}_rerank_ms"] += rerank_ms
+                self._log(
+                    f"Evaluate query {idx+1}/{len(self.dataset)} [{arm}]: "
+                    f"candidates = {len(candidates)}, rerank = {rerank_ms:.1f} ms, Recall@K = {recall_k:.4f}"
+                )
+
+        if unscored:
+            self._log(
+                f"Notice: the retriever returned no retrieval scores for {unscored}/{len(self.dataset)} queries, "
+                "the adaptive budget reranked every candidate for them"
+            )
+        return {key: value / len(self.dataset) for key, value in totals.items()} if self.dataset else totals
+
+    def normalize_url(self, url: str) -> str:
+        """Normalize URL for comparison."""
+        return url.strip().replace("https://www.shl.com/products", "https://www.shl.com/solutions/products")
@@ -1,15 +1,17 @@
 from collections import defaultdict
 import os
 from time import sleep
-from typing import Dict, List
+from typing import Dict, List, Optional
     
 from app.services.query.query_transformer import QueryTransformer
 from app.services.balancer.balancer import ResultBalancer
 from app.pydantic_models.data_model import DatasetRow
+from app.services.recommender.candidate_budget import CandidateBudget
 from app.services.reranker.base_reranker import BaseReranker
 from langchain_core.retrievers import BaseRetriever
 from app.evaluation.eval_retriever import EvalRetriever
 from app.evaluation.eval_reranker import EvalReranker
+from app.evaluation.eval_candidate_budget import EvalCandidateBudget
 
 
 class Evaluator:
@@ -24,11 +26,13 @@ class Evaluator:
         reranker: BaseReranker,
         balancer: ResultBalancer,
         dataset_file: str = "app/evaluation/dataset.xlsx",
-        results_file: str = "eval_results.txt"
+        results_file: str = "eval_results.txt",
+        candidate_budget: Optional[CandidateBudget] = None
     ):
         self.retriever = retriever
         self.reranker = reranker
         self.balancer = balancer
+        self.candidate_budget = candidate_budget
         self.query_transformer = query_transformer
         self.dataset_file = dataset_file
         self.results_file = results_file
@@ -111,9 +115,36 @@ class Evaluator:
         self._log(f"\nReranker+Balancer Average Recall@K: {recall:.4f}")
         return recall
     
+    def evaluate_candidate_budget(self) -> Dict[str, float]:
+        """Compare the adaptive candidate budget with reranking every retrieved candidate."""
+        if self.candidate_budget is None:
+            raise ValueError("Candidate budget not provided. Cannot evaluate candidate budget.")
+        
+        self._log("\n" + "="*50)
+        self._log("EVALUATING ADAPTIVE CANDIDATE BUDGET")
+        self._log("="*50)
+        
+        eval_candidate_budget = EvalCandidateBudget(
+            retriever=self.retriever,
+            reranker=self.reranker,
+            balancer=self.balancer,
+            candidate_budget=self.candidate_budget,
+            dataset=self.dataset,
+            transformed_queries=self.transformed_queries,
+            log_func=self._log
+        )
+        results = eval_candidate_budget.evaluate()
+        for arm in ("full", "adaptive"):
+            self._log(
+                f"\n{arm.capitalize()} budget: {results[f'{arm}_candidates']:.1f} candidates, "
+                f"{results[f'{arm}_rerank_ms']:.1f} ms rerank, Recall@K {results[f'{arm}_recall']:.4f}"
+            )
+        return results
+    
     def evaluate_all(self) -> Dict[str, float]:
         """
-        Run both retriever and reranker+balancer evaluations.
+        Run both retriever and reranker+balancer evaluations, and the adaptive
+        candidate budget comparison when a budget is provided.
         Returns a dictionary with results.
         """
         results = {}
@@ -124,12 +155,22 @@ class Evaluator:
         if self.reranker is not None and self.balancer is not None:
             results["pipeline_recall"] = self.evaluate_reranker()
         
+        if self.reranker is not None and self.balancer is not None and self.candidate_budget is not None:
+            budget_results = self.evaluate_candidate_budget()
+            results["full_budget_recall"] = budget_results["full_recall"]
+            results["adaptive_budget_recall"] = budget_results["adaptive_recall"]
+            results["adaptive_budget_candidates"] = budget_results["adaptive_candidates"]
+            results["rerank_ms_saved"] = budget_results["full_rerank_ms"] - budget_results["adaptive_rerank_ms"]
+        
         self._log("\n" + "="*50)
         self._log("EVALUATION SUMMARY")
         self._log("="*50)
         self._log(f"Retriever Recall@K:          {results['retriever_recall']:.4f}")
         if "pipeline_recall" in results:
             self._log(f"Reranker+Balancer Recall@K:  {results['pipeline_recall']:.4f}")
+        if "adaptive_budget_recall" in results:
+            self._log(f"Adaptive budget Recall@K:    {results['adaptive_budget_recall']:.4f} (full budget {results['full_budget_recall']:.4f})")
+            self._log(f"Adaptive budget candidates:  {results['adaptive_budget_candidates']:.1f}, {results['rerank_ms_saved']:.1f} ms rerank saved per query")
         self._log("="*50)
         
         print(f"Evaluation complete. Please see the results in '{self.results_file}'")
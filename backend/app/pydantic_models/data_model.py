@@ -29,6 +29,15 @@ class LLMStructuredOutput(BaseModel):
     duration_preference: Optional[str]
 
 
+class DocumentScore(BaseModel):
+    index: int = Field(description="Document number as listed in the prompt")
+    score: float = Field(description="Relevance of the document to the query, from 0 to 1")
+
+
+class ListwiseScores(BaseModel):
+    scores: List[DocumentScore]
+
+
 class DatasetRow(BaseModel):
     query: str
     urls: Set[str]
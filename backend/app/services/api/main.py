@@ -1,10 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.services.api.pipeline import lifespan
 from app.services.api.routes import health, recommend
+from app.utils.metrics import REGISTRY
 
 
-app = FastAPI(title="SHL Assessment Recommendation Engine API", version="1.0.0")
+app = FastAPI(title="SHL Assessment Recommendation Engine API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,3 +23,8 @@ app.include_router(recommend.router)
 @app.get("/")
 def root():
     return {"message": "Welcome to the SHL Assessment Recommendation Engine API built by Mayuresh Choudhary!"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Stage latency histograms, request, error and cache counters in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.services.balancer.balancer import ResultBalancer
+from app.services.llm.factory import get_llm
+from app.services.query.query_cache import get_query_cache
+from app.services.query.query_transformer import QueryTransformer
+from app.services.recommender.candidate_budget import CandidateBudget
+from app.services.recommender.recommender import Recommender
+from app.services.reranker.factory import get_reranker
+from app.services.retriever.factory import get_retriever
+from app.utils.envs import Envs
+from app.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def build_recommender() -> Recommender:
+    """Build the recommendation pipeline, once per process."""
+    return Recommender(
+        query_transformer=QueryTransformer(llm=get_llm(), cache=get_query_cache()),
+        retriever=get_retriever(),
+        reranker=get_reranker(),
+        balancer=ResultBalancer(),
+        speculative_retrieval=Envs.SPECULATIVE_RETRIEVAL,
+        filter_mode=Envs.RETRIEVAL_FILTER_MODE,
+        candidate_budget=CandidateBudget() if Envs.ADAPTIVE_CANDIDATES else None
+    )
+
+
+async def warm_up(recommender: Recommender) -> None:
+    """
+    Send a synthetic query through every stage so the first real request does not pay
+    for lazy client setup (TLS handshakes, async index handles, etc.).
+    The query cache is bypassed, otherwise later cold starts would skip the LLM stage.
+    """
+    warmup_recommender = Recommender(
+        query_transformer=QueryTransformer(llm=recommender.query_transformer.llm),
+        retriever=recommender.retriever,
+        reranker=recommender.reranker,
+        balancer=recommender.balancer,
+        speculative_retrieval=recommender.speculative_retrieval,
+        filter_mode=recommender.filter_mode,
+        candidate_budget=recommender.candidate_budget
+    )
+    start = time.perf_counter()
+    try:
+        await warmup_recommender.arecommend(Envs.WARMUP_QUERY)
+        logger.info("pipeline warm-up completed", extra={"fields": {"seconds": time.perf_counter() - start}})
+    except Exception as e:
+        # A failed warm-up only costs latency on the first request, it must not keep the API down
+        logger.warning("pipeline warm-up failed", extra={"fields": {"seconds": time.perf_counter() - start, "error": e}})
+
+
+async def _warm_up_and_mark_ready(app: FastAPI) -> None:
+    if Envs.WARMUP_ENABLED:
+        await warm_up(app.state.recommender)
+    app.state.ready = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the pipeline, then warm it up in the background. uvicorn only accepts connections
+    once startup is done, so warming up after startup is what lets `/health/ready`
+    answer 503 while it runs. Requests arriving meanwhile are served, just cold.
+    """
+    app.state.ready = False
+    app.state.recommender = build_recommender()
+    warm_up_task = asyncio.create_task(_warm_up_and_mark_ready(app))
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+from typing import Any, Dict, Optional
+
+from app.services.ingester.catalogue_version import get_catalogue_version
+from app.utils.cache import TieredCache, make_cache_key, normalize_text
+from app.utils.envs import Envs
+from app.utils.metrics import REGISTRY
+
+
+def pipeline_config() -> Dict[str, Any]:
+    """Every setting that changes the /recommend output for a given query."""
+    from app.services.embedder.factory import get_embedder_name
+    from app.services.llm.factory import get_llm_name
+
+    return {
+        "llm": get_llm_name(),
+        "embedder": get_embedder_name(),
+        "vector_store": Envs.VECTOR_STORE,
+        "retriever": Envs.RETRIEVER_PROVIDER,
+        "reranker": Envs.RERANKER_PROVIDER,
+        "llm_reranker_mode": Envs.LLM_RERANKER_MODE,
+        "llm_reranker_batch_size": Envs.LLM_RERANKER_BATCH_SIZE,
+        "top_k": Envs.TOP_K,
+        "fetch_k": Envs.FETCH_K,
+        "lambda_mult": Envs.LAMBDA_MULT,
+        "retrieval_filter_mode": Envs.RETRIEVAL_FILTER_MODE,
+        "filtered_top_k": Envs.FILTERED_TOP_K,
+        "filtered_fetch_k": Envs.FILTERED_FETCH_K,
+        "adaptive_candidates": Envs.ADAPTIVE_CANDIDATES,
+        "adaptive_min_candidates": Envs.ADAPTIVE_MIN_CANDIDATES,
+        "adaptive_gap_ratio": Envs.ADAPTIVE_GAP_RATIO,
+        "adaptive_plateau_ratio": Envs.ADAPTIVE_PLATEAU_RATIO,
+        "adaptive_min_spread": Envs.ADAPTIVE_MIN_SPREAD,
+        "hybrid_sparse_k": Envs.HYBRID_SPARSE_K,
+        "hybrid_rrf_k": Envs.HYBRID_RRF_K,
+        "speculative_retrieval": Envs.SPECULATIVE_RETRIEVAL,
+        "reranker_top_n": Envs.RERANKER_TOP_N,
+        "min_results": Envs.MIN_RESULTS,
+        "max_results": Envs.MAX_RESULTS,
+    }
+
+
+class ResponseCache:
+    """
+    Caches full /recommend responses keyed on the normalized query, the pipeline
+    configuration and the catalogue version. Publishing a new catalogue version
+    changes every key, so stale responses are never served after a re-ingest.
+    """
+
+    def __init__(self, cache: TieredCache):
+        self.cache = cache
+        self._config = pipeline_config()
+
+    def _key(self, query: str) -> str:
+        return make_cache_key(normalize_text(query), self._config, get_catalogue_version())
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get(self._key(query))
+
+    def set(self, query: str, response: Dict[str, Any]) -> None:
+        self.cache.set(self._key(query), response)
+
+    async def aget(self, query: str) -> Optional[Dict[str, Any]]:
+        """`get` off the event loop, a miss in memory reads the SQLite tier."""
+        return await asyncio.to_thread(self.get, query)
+
+    async def aset(self, query: str, response: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self.set, query, response)
+
+    def hit_rate(self) -> float:
+        return self.cache.stats()["hit_rate"]
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Returns the shared response cache, or None unless RESPONSE_CACHE_ENABLED is set."""
+    global _response_cache
+    if not Envs.RESPONSE_CACHE_ENABLED:
+        return None
+
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            REGISTRY.register_cache(TieredCache(
+                name="responses",
+                max_size=Envs.RESPONSE_CACHE_SIZE,
+                dumps=lambda response: json.dumps(response).encode("utf-8"),
+                loads=json.loads,
+                disk_path=os.path.join(Envs.CACHE_DIR, "responses.sqlite"),
+                max_disk_entries=Envs.RESPONSE_CACHE_DISK_ENTRIES,
+                ttl=Envs.RESPONSE_CACHE_TTL
+            ))
+        )
+    return _response_cache
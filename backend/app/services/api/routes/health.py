@@ -1,7 +1,14 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
 @router.get("/")
 def health_check():
     return {"status": "healthy"}
+
+@router.get("/ready")
+def readiness_check(request: Request):
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready"}
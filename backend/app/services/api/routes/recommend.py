@@ -1,49 +1,211 @@
-from typing import Dict, List
-from fastapi import APIRouter
+import json
+import time
+from typing import Annotated, Any, AsyncIterator, Dict, List
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import StreamingResponse
 from groq import BaseModel
 from langchain_classic.retrievers.contextual_compression import (
     ContextualCompressionRetriever,
 )
+from langchain_core.documents import Document
 from pydantic import Field
 
 from app.pydantic_models.data_model import IndividualTest
-from app.services.balancer.balancer import ResultBalancer
-from app.services.llm.factory import get_llm
-from app.services.query.query_transformer import QueryTransformer
+from app.services.api.response_cache import get_response_cache
+from app.services.ingester.catalogue_version import get_catalogue_version
 from app.services.recommender.recommender import Recommender
-from app.services.reranker.factory import get_reranker
-from app.services.retriever.factory import get_retriever
+from app.services.retriever.vector_search import RETRIEVAL_SCORE_KEY
 from app.services.scraper.assessment_scraper import TEST_TYPE_MAP
+from app.utils.cache import normalize_text
+from app.utils.envs import Envs
+from app.utils.logger import get_logger
+from app.utils.metrics import REQUESTS, stage_span
+
+
+logger = get_logger(__name__)
 
 
 class Body(BaseModel):
     query: str = Field(..., min_length=1)
 
 
+class BatchBody(BaseModel):
+    queries: List[Annotated[str, Field(min_length=1)]] = Field(..., min_length=1, max_length=Envs.BATCH_MAX_QUERIES)
+
+
+def to_assessment(doc: Document) -> Dict:
+    """Convert a recommended document into the API response format, without mutating it."""
+    assessment = dict(doc.metadata)
+    assessment.pop("relevance_score", None)
+    assessment.pop(RETRIEVAL_SCORE_KEY, None)
+    assessment["test_type"] = [TEST_TYPE_MAP[test_type] for test_type in doc.metadata.get("test_type", [])]
+    assessment["adaptive_support"] = "Yes" if doc.metadata.get("adaptive_support", False) else "No"
+    assessment["remote_support"] = "Yes" if doc.metadata.get("remote_support", False) else "No"
+    return assessment
+
+
+def to_candidate_preview(docs: List[Document], limit: int) -> List[Dict]:
+    """First `limit` distinct assessments in retrieval order, chunks of one assessment share a url."""
+    seen = set()
+    preview = []
+    for doc in docs:
+        url = doc.metadata.get("url")
+        if url in seen:
+            continue
+        seen.add(url)
+        preview.append(to_assessment(doc))
+        if len(preview) == limit:
+            break
+    return preview
+
+
+def _ndjson(event: Dict[str, Any]) -> str:
+    return json.dumps(event, default=str) + "\n"
+
+
 router = APIRouter(prefix="/recommend", tags=["Recommendations"])
 
 @router.post("/")
-def recommend(body: Body):
-    
-    recommender = Recommender(
-        query_transformer=QueryTransformer(llm=get_llm()),
-        retriever=get_retriever(),
-        reranker=get_reranker(),
-        balancer=ResultBalancer()
-    )
-    
-    recommendations = recommender.recommend(body.query)
-    
-    recommended_tests = []
-    for idx, doc in enumerate(recommendations, start=1):
-        del doc.metadata["relevance_score"]
-        doc.metadata["test_type"] = [TEST_TYPE_MAP[test_type] for test_type in doc.metadata.get("test_type", [])]
-        doc.metadata["adaptive_support"] = "Yes" if doc.metadata.get("adaptive_support", False) else "No"
-        doc.metadata["remote_support"] = "Yes" if doc.metadata.get("remote_support", False) else "No"
-        recommended_tests.append(
-            doc.metadata
-        )
+async def recommend(body: Body, request: Request, response: Response):
+    
+    response_cache = get_response_cache()
+    if response_cache is None:
+        response.headers["X-Cache"] = "BYPASS"
+    else:
+        cached = await response_cache.aget(body.query)
+        response.headers["X-Cache"] = "HIT" if cached is not None else "MISS"
+        response.headers["X-Cache-Hit-Rate"] = f"{response_cache.hit_rate():.4f}"
+        response.headers["X-Catalogue-Version"] = get_catalogue_version()
+        if cached is not None:
+            REQUESTS.inc(route="recommend", cache="HIT")
+            return cached
+    REQUESTS.inc(route="recommend", cache=response.headers["X-Cache"])
+    
+    recommender: Recommender = request.app.state.recommender
+    
+    recommendations = await recommender.arecommend(body.query)
+    
+    with stage_span("serialize"):
+        recommended_tests = []
+        for idx, doc in enumerate(recommendations, start=1):
+            recommended_tests.append(
+                to_assessment(doc)
+            )
+        
+        result = {
+            "recommended_assessments": recommended_tests
+        }
+        
+        if response_cache is not None:
+            await response_cache.aset(body.query, result)
+    
+    return result
+
+
+@router.post("/stream")
+async def recommend_stream(body: Body, request: Request):
+    """
+    Same pipeline as `/recommend/`, streamed as NDJSON, one event per line:
+    `intent` (rewritten query and inferred preferences), `candidates` (dense-ranked preview)
+    and `recommendations` (final reranked, balanced list). Each event carries its
+    stage timings in `stage_ms` and the time since the request started in `elapsed_ms`.
+    """
+    response_cache = get_response_cache()
+    headers = {"X-Cache": "BYPASS"}
+    cached = None
+    if response_cache is not None:
+        cached = await response_cache.aget(body.query)
+        headers = {
+            "X-Cache": "HIT" if cached is not None else "MISS",
+            "X-Cache-Hit-Rate": f"{response_cache.hit_rate():.4f}",
+            "X-Catalogue-Version": get_catalogue_version(),
+        }
+    REQUESTS.inc(route="recommend_stream", cache=headers["X-Cache"])
+    
+    recommender: Recommender = request.app.state.recommender
+    
+    async def events() -> AsyncIterator[str]:
+        start = time.perf_counter()
+        
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - start) * 1000, 2)
+        
+        if cached is not None:
+            yield _ndjson({"stage": "recommendations", "stage_ms": {}, "elapsed_ms": elapsed_ms(), **cached})
+            return
+        
+        try:
+            async for event in recommender.astream_recommend(body.query):
+                stage = event["stage"]
+                payload: Dict[str, Any] = {"stage": stage, "stage_ms": event["stage_ms"], "elapsed_ms": elapsed_ms()}
+                if stage == "intent":
+                    transformed_query = event["transformed_query"]
+                    payload["rewritten_query"] = transformed_query.rewritten_query
+                    payload["preferred_intent"] = transformed_query.preferred_intent.model_dump()
+                elif stage == "candidates":
+                    payload["candidates"] = to_candidate_preview(event["documents"], Envs.MAX_RESULTS)
+                else:
+                    with stage_span("serialize"):
+                        result = {"recommended_assessments": [to_assessment(doc) for doc in event["documents"]]}
+                        if response_cache is not None:
+                            await response_cache.aset(body.query, result)
+                    payload.update(result)
+                yield _ndjson(payload)
+        except Exception as e:
+            # The status line is already sent, so failures are reported in-band
+            logger.error("streaming recommendation failed", extra={"fields": {"error": e}})
+            yield _ndjson({"stage": "error", "elapsed_ms": elapsed_ms(), "detail": "Recommendation failed"})
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers=headers)
+
+
+@router.post("/batch")
+async def recommend_batch(body: BatchBody, request: Request, response: Response):
+    """
+    Recommendations for several queries in one request, returned in input order.
+    Queries that only differ in whitespace or unicode form are computed once,
+    and a failing query gets an `error` entry instead of failing the whole batch.
+    """
+    response_cache = get_response_cache()
+    
+    # One representative query per normalized form, the response cache is keyed the same way
+    representatives: Dict[str, str] = {}
+    for query in body.queries:
+        representatives.setdefault(normalize_text(query), query)
+    
+    results: Dict[str, Dict] = {}
+    if response_cache is not None:
+        for key, query in representatives.items():
+            cached = await response_cache.aget(query)
+            if cached is not None:
+                results[key] = cached
+        response.headers["X-Cache-Hit-Rate"] = f"{response_cache.hit_rate():.4f}"
+        response.headers["X-Catalogue-Version"] = get_catalogue_version()
+    
+    recommender: Recommender = request.app.state.recommender
+    
+    missing = [query for key, query in representatives.items() if key not in results]
+    if results:
+        REQUESTS.inc(len(results), route="recommend_batch", cache="HIT")
+    if missing:
+        REQUESTS.inc(len(missing), route="recommend_batch", cache="BYPASS" if response_cache is None else "MISS")
+    if missing:
+        recommendations = await recommender.arecommend_batch(missing, Envs.BATCH_CONCURRENCY)
+        with stage_span("serialize"):
+            for query in missing:
+                outcome = recommendations[query]
+                if isinstance(outcome, Exception):
+                    logger.error("batch recommendation failed", extra={"fields": {"query": query, "error": outcome}})
+                    results[normalize_text(query)] = {"error": "Recommendation failed"}
+                    continue
+                result = {"recommended_assessments": [to_assessment(doc) for doc in outcome]}
+                if response_cache is not None:
+                    await response_cache.aset(query, result)
+                results[normalize_text(query)] = result
     
     return {
-        "recommended_assessments": recommended_tests
+        "results": [
+            {"query": query, **results[normalize_text(query)]}
+            for query in body.queries
+        ]
     }
@@ -1,5 +1,6 @@
+import heapq
 from collections import defaultdict
-from typing import DefaultDict, List, Tuple
+from typing import DefaultDict, List, Optional, Tuple
 from langchain_core.documents import Document
 
 from app.pydantic_models.data_model import PreferredIntent
@@ -13,6 +14,9 @@ class ResultBalancer:
     It slowly penalizes documents that do not belong to preferred test types to ensure
     a diverse set of relevant balanced recommendations.
     """
+    
+    RATIO = 0.55
+    DURATION_MATCH_BONUS = 0.05
 
     def balance_penalty(
         self,
@@ -34,47 +38,65 @@ class ResultBalancer:
         for t in test_type:
             appearance_counts[t] += 1
 
+    def duration_bonus(self, duration: Optional[int], preferred_intent: PreferredIntent) -> float:
+        """Small boost for assessments in the preferred duration bucket (unknown durations are 0)."""
+        if not preferred_intent.duration_preference or not duration:
+            return 0.0
+        if duration <= 30:
+            bucket = "short"
+        elif duration <= 60:
+            bucket = "medium"
+        else:
+            bucket = "long"
+        return self.DURATION_MATCH_BONUS if bucket == preferred_intent.duration_preference else 0.0
+
     def balance_selection(
         self,
         reranked_docs: List[Tuple[Document, float]],
         intent: PreferredIntent
     ) -> List[Document]:
+        """
+        Greedy selection: each pick takes the candidate with the best current score, i.e. its
+        normalized relevance plus the duration bonus minus the diversity penalty given the test
+        types picked so far. Penalties only grow as counts grow, so scores only go down and a
+        lazy max-heap is exact: a popped candidate is re-scored, and pushed back when its score
+        dropped since it was queued, instead of re-scoring every candidate after each pick.
+        Ties go to the higher-ranked candidate.
+        """
         if not reranked_docs:
             return []
         
         final_docs = []
         appearance_counts = defaultdict(int)
-        RATIO = 0.55
-        top_score = reranked_docs[0][1]
-        adjusted_candidates = []
-
-        for doc, score in reranked_docs:
-            norm_score = score / top_score
-            penalty = self.balance_penalty(
-                doc.metadata["test_type"],
-                appearance_counts,
-                intent
-            )
-            adjusted_score = norm_score - penalty
-            adjusted_candidates.append((adjusted_score, doc))
-
-        adjusted_candidates.sort(key=lambda x: x[0], reverse=True)
+        top_score = max(score for _, score in reranked_docs)
+        threshold = top_score * self.RATIO
+        
+        # The part of the score that does not depend on the picks
+        base_scores = [
+            (score / top_score if top_score > 0 else 0.0) + self.duration_bonus(doc.metadata.get("duration"), intent)
+            for doc, score in reranked_docs
+        ]
+        heap = [(-base_score, idx) for idx, base_score in enumerate(base_scores)]
+        heapq.heapify(heap)
 
         unique_docs = set()
-        for adj_score, doc in adjusted_candidates:
-            decay = (adj_score < (top_score * RATIO))
-            
-            if (len(final_docs) >= Envs.MIN_RESULTS and decay):
-                break
-            
+        while heap and len(final_docs) < Envs.MAX_RESULTS:
+            queued_score, idx = heapq.heappop(heap)
+            doc = reranked_docs[idx][0]
             if doc.metadata["url"] in unique_docs:
                 continue
             
+            adjusted_score = base_scores[idx] - self.balance_penalty(doc.metadata["test_type"], appearance_counts, intent)
+            if adjusted_score < -queued_score:
+                heapq.heappush(heap, (-adjusted_score, idx))
+                continue
+            
+            decay = adjusted_score < threshold
+            if len(final_docs) >= Envs.MIN_RESULTS and decay:
+                break
+            
             final_docs.append(doc)
             self.update_counts(doc.metadata["test_type"], appearance_counts)
             unique_docs.add(doc.metadata["url"])
 
-            if len(final_docs) >= Envs.MAX_RESULTS:
-                break
-
         return final_docs
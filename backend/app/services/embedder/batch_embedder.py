@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.services.embedder.cached_embedder import CachedEmbeddings
+from app.utils.envs import Envs
+from app.utils.logger import get_logger
+from app.utils.rate_limiter import TokenBucket
+
+
+logger = get_logger(__name__)
+
+
+class BatchEmbedder:
+    """
+    Embeds documents for ingestion in front of a cached embedder: texts are deduplicated by
+    their cache key, cached vectors are reused, and only the misses are sent to the provider,
+    in batches of `batch_size` texts. Batches run on `concurrency` threads shared by every
+    caller, each request waits for the `rate` (requests per second) budget and failed requests
+    are retried with exponential backoff. Vectors are written back to the persistent cache,
+    so a later `add_documents` on the vector store reads them instead of calling the API.
+    """
+
+    def __init__(
+        self,
+        embedder: CachedEmbeddings,
+        batch_size: int = Envs.EMBEDDING_BATCH_SIZE,
+        concurrency: int = Envs.EMBEDDING_CONCURRENCY,
+        rate: Optional[float] = Envs.EMBEDDING_RATE_LIMIT,
+        max_retries: int = Envs.EMBEDDING_MAX_RETRIES,
+        backoff: float = Envs.EMBEDDING_BACKOFF
+    ):
+        self.embedder = embedder
+        self.batch_size = max(batch_size, 1)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rate_limiter = TokenBucket(rate, capacity=concurrency) if rate else None
+        self._executor = ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="embed")
+        self._lock = threading.Lock()
+        self.counters = {"texts": 0, "duplicates": 0, "cached": 0, "embedded": 0, "requests": 0, "retries": 0}
+
+    def _count(self, **amounts: int) -> None:
+        with self._lock:
+            for key, amount in amounts.items():
+                self.counters[key] += amount
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            self._count(requests=1)
+            try:
+                # The cached embedder's inner embedder, the cache lookup already happened
+                return self.embedder.embedder.embed_documents(texts)
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                attempt += 1
+                self._count(retries=1)
+                logger.warning(
+                    "embedding batch failed, retrying",
+                    extra={"fields": {"texts": len(texts), "attempt": attempt, "delay": delay, "error": e}}
+                )
+                time.sleep(delay)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Vectors of `texts` in order, embedding each distinct uncached text once."""
+        unique: Dict[str, str] = {}
+        for text in texts:
+            unique.setdefault(self.embedder.document_key(text), text)
+
+        cached = self.embedder.cached_documents(list(unique.values()))
+        missing = [text for text, vector in cached.items() if vector is None]
+        self._count(
+            texts=len(texts),
+            duplicates=len(texts) - len(unique),
+            cached=len(unique) - len(missing),
+            embedded=len(missing)
+        )
+
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        for batch, vectors in zip(batches, self._executor.map(self._embed_batch, batches)):
+            self.embedder.store_documents(batch, vectors)
+            cached.update(zip(batch, vectors))
+
+        return [list(cached[unique[self.embedder.document_key(text)]]) for text in texts]  # type: ignore
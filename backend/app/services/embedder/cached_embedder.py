@@ -0,0 +1,112 @@
+import os
+from array import array
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.utils.cache import TieredCache, make_cache_key, normalize_text
+from app.utils.envs import Envs
+from app.utils.metrics import REGISTRY
+
+
+def _dump_vector(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _load_vector(raw: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(raw)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedder with a two-tier (memory + disk) cache keyed on
+    (model, task type, normalized text), so repeated queries and documents
+    skip the embedding API entirely.
+    """
+
+    def __init__(self, embedder: Embeddings, cache: TieredCache, model: str, task_type: Optional[str]):
+        self.embedder = embedder
+        self.cache = cache
+        self.model = model
+        self.task_type = task_type
+
+    def _key(self, text: str, kind: str) -> str:
+        # Providers embed queries and documents differently unless a task type is pinned
+        return make_cache_key(self.model, self.task_type or kind, normalize_text(text))
+
+    def _lookup(self, texts: List[str], kind: str) -> Dict[str, Optional[List[float]]]:
+        return {text: self.cache.get(self._key(text, kind)) for text in dict.fromkeys(texts)}
+
+    def _store(self, texts: List[str], vectors: List[List[float]], kind: str) -> None:
+        for text, vector in zip(texts, vectors):
+            self.cache.set(self._key(text, kind), list(vector))
+
+    def document_key(self, text: str) -> str:
+        """Cache key of a document text, texts with the same key share one vector."""
+        return self._key(text, "document")
+
+    def cached_documents(self, texts: List[str]) -> Dict[str, Optional[List[float]]]:
+        """Cached vector of every distinct text, None for texts that still need embedding."""
+        return self._lookup(texts, "document")
+
+    def store_documents(self, texts: List[str], vectors: List[List[float]]) -> None:
+        """Cache vectors computed outside of this embedder, e.g. by the ingestion BatchEmbedder."""
+        self._store(texts, vectors, "document")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        cached = self._lookup(texts, "document")
+        missing = [text for text, vector in cached.items() if vector is None]
+        if missing:
+            vectors = self.embedder.embed_documents(missing)
+            self._store(missing, vectors, "document")
+            cached.update(zip(missing, vectors))
+        return [list(cached[text]) for text in texts]  # type: ignore
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(self._key(text, "query"))
+        if vector is None:
+            vector = self.embedder.embed_query(text)
+            self._store([text], [vector], "query")
+        return list(vector)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        cached = self._lookup(texts, "document")
+        missing = [text for text, vector in cached.items() if vector is None]
+        if missing:
+            vectors = await self.embedder.aembed_documents(missing)
+            self._store(missing, vectors, "document")
+            cached.update(zip(missing, vectors))
+        return [list(cached[text]) for text in texts]  # type: ignore
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(self._key(text, "query"))
+        if vector is None:
+            vector = await self.embedder.aembed_query(text)
+            self._store([text], [vector], "query")
+        return list(vector)
+
+
+embedding_cache: Optional[TieredCache] = None
+if Envs.EMBEDDING_CACHE_ENABLED:
+    embedding_cache = REGISTRY.register_cache(TieredCache(
+        name="embeddings",
+        max_size=Envs.EMBEDDING_CACHE_SIZE,
+        dumps=_dump_vector,
+        loads=_load_vector,
+        disk_path=os.path.join(Envs.CACHE_DIR, "embeddings.sqlite"),
+        max_disk_entries=Envs.EMBEDDING_CACHE_DISK_ENTRIES
+    ))
+
+
+def with_embedding_cache(embedder: Embeddings) -> Embeddings:
+    """Put the shared embedding cache in front of an embedder, unless caching is disabled."""
+    if embedding_cache is None:
+        return embedder
+    return CachedEmbeddings(
+        embedder=embedder,
+        cache=embedding_cache,
+        model=getattr(embedder, "model", type(embedder).__name__),
+        task_type=getattr(embedder, "task_type", None)
+    )
@@ -1,18 +1,36 @@
-from app.services.embedder.google_embedder import google_embedder
 from app.utils.envs import Envs
+from app.utils.registry import LazyRegistry
 
 
-_PROVIDER_MAP = {
-    "google": {
-        "embedder": google_embedder,
+def _google_embedder():
+    from app.services.embedder.cached_embedder import with_embedding_cache
+    from app.services.embedder.google_embedder import google_embedder
+    from app.services.embedder.instrumented_embedder import InstrumentedEmbeddings
+
+    return {
+        "embedder": with_embedding_cache(InstrumentedEmbeddings(google_embedder)),
         "dimension": 3072,
-    },
-}
+    }
 
-def get_embedder():
+
+_PROVIDER_MAP = LazyRegistry({
+    "google": _google_embedder,
+})
+
+_MODEL_NAME_MAP = LazyRegistry({
+    "google": "app.services.embedder.google_embedder:GOOGLE_EMBEDDING_MODEL",
+})
+
+def _get_provider() -> str:
     provider = (getattr(Envs, "EMBEDDER") or "google").lower()
-    
     if provider not in _PROVIDER_MAP:
         raise ValueError(f"Unsupported embedder provider: {provider}")
-    
-    return _PROVIDER_MAP[provider]
\ No newline at end of file
+    return provider
+
+def get_embedder():
+    return _PROVIDER_MAP[_get_provider()]
+
+def get_embedder_name() -> str:
+    """Provider and model of the configured embedder, e.g. `google:models/gemini-embedding-001`."""
+    provider = _get_provider()
+    return f"{provider}:{_MODEL_NAME_MAP[provider]}"
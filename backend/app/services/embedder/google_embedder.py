@@ -4,8 +4,10 @@ from app.utils.envs import Envs
 
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
+GOOGLE_EMBEDDING_MODEL = "models/gemini-embedding-001"
+
 os.environ["GOOGLE_API_KEY"] = Envs.GOOGLE_API_KEY
 google_embedder = GoogleGenerativeAIEmbeddings(
-    model="models/gemini-embedding-001", 
+    model=GOOGLE_EMBEDDING_MODEL, 
     task_type="SEMANTIC_SIMILARITY"
 )
\ No newline at end of file
@@ -0,0 +1,37 @@
+from typing import Any, List
+
+from langchain_core.embeddings import Embeddings
+
+from app.utils.metrics import stage_span
+
+
+class InstrumentedEmbeddings(Embeddings):
+    """
+    Times every call to the wrapped embedder as the `embed` stage and counts its failures
+    as upstream errors. Placed under the embedding cache, so only real API calls are measured.
+    """
+
+    def __init__(self, embedder: Embeddings):
+        self.embedder = embedder
+
+    def __getattr__(self, name: str) -> Any:
+        # Cache keys and callers read attributes such as `model` and `task_type` of the wrapped embedder
+        if name == "embedder":
+            raise AttributeError(name)
+        return getattr(self.embedder, name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with stage_span("embed", upstream="embedder"):
+            return self.embedder.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with stage_span("embed", upstream="embedder"):
+            return self.embedder.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        with stage_span("embed", upstream="embedder"):
+            return await self.embedder.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        with stage_span("embed", upstream="embedder"):
+            return await self.embedder.aembed_query(text)
@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from langchain_core.documents import Document
+
+from app.pydantic_models.data_model import IndividualTest
+
+
+SNAPSHOT_FORMAT = 1
+CURRENT_FILE = "CURRENT"
+SNAPSHOT_SUFFIX = ".jsonl.gz"
+
+
+def to_record(test: IndividualTest) -> Dict:
+    """Serializable form of a scraped assessment. `page_content` is excluded from dumps, so it is added explicitly."""
+    return {**test.model_dump(), "page_content": test.page_content}
+
+
+def from_record(record: Dict) -> IndividualTest:
+    return IndividualTest(**record)
+
+
+def to_document(test: IndividualTest) -> Document:
+    """Vector store document of an assessment, before splitting."""
+    return Document(
+        page_content=test.page_content,  # type: ignore
+        metadata={
+            "url": test.url,
+            "name": test.name,
+            "description": test.description,
+            "adaptive_support": test.adaptive_support,
+            "duration": test.duration,
+            "remote_support": test.remote_support,
+            "test_type": test.test_type
+        }
+    )
+
+
+def _encode(records: List[Dict]) -> bytes:
+    return b"".join(
+        json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+        for record in records
+    )
+
+
+def read_current_version(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, CURRENT_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _read_header(path: str) -> Dict:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.loads(f.readline())
+
+
+def read_catalogue_snapshot(directory: str, version: Optional[str] = None) -> List[IndividualTest]:
+    """Assessments of a catalogue snapshot version (the current one by default), empty if there is none."""
+    version = version or read_current_version(directory)
+    if version is None:
+        return []
+    with gzip.open(os.path.join(directory, version + SNAPSHOT_SUFFIX), "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported catalogue snapshot format: {header.get('format')}")
+        return [from_record(json.loads(line)) for line in f]
+
+
+def write_catalogue_snapshot(directory: str, tests: Iterable[IndividualTest], keep_versions: int = 3) -> str:
+    """
+    Write the scraped catalogue as a new snapshot version and make it current.
+
+    A snapshot is one gzipped JSONL file: a header line (format, version, count, content hash)
+    followed by one assessment per line, sorted by URL. When the content equals the current
+    snapshot nothing is written and the current version is returned. Only the newest
+    `keep_versions` snapshots are kept.
+    """
+    records = sorted((to_record(test) for test in tests), key=lambda record: record["url"])
+    body = _encode(records)
+    digest = hashlib.sha256(body).hexdigest()
+
+    current = read_current_version(directory)
+    if current is not None:
+        try:
+            if _read_header(os.path.join(directory, current + SNAPSHOT_SUFFIX)).get("sha256") == digest:
+                return current
+        except FileNotFoundError:
+            pass
+
+    version = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{digest[:12]}"
+    header = {"format": SNAPSHOT_FORMAT, "version": version, "count": len(records), "sha256": digest, "created_at": time.time()}
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, version + SNAPSHOT_SUFFIX)
+    with gzip.open(path + ".tmp", "wb") as f:
+        f.write(_encode([header]) + body)
+    os.replace(path + ".tmp", path)
+
+    current_tmp = os.path.join(directory, CURRENT_FILE + ".tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(directory, CURRENT_FILE))
+
+    versions = sorted(name for name in os.listdir(directory) if name.endswith(SNAPSHOT_SUFFIX))
+    for name in versions[:-keep_versions]:
+        if name != version + SNAPSHOT_SUFFIX:
+            os.remove(os.path.join(directory, name))
+    print(f"Wrote catalogue snapshot {version} ({len(records)} assessments)")
+    return version
@@ -0,0 +1,45 @@
+import os
+import time
+import uuid
+from typing import Optional
+
+from app.utils.envs import Envs
+from app.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+_cached_version: str = ""
+_cached_mtime: Optional[int] = None
+
+
+def publish_catalogue_version(version: Optional[str] = None) -> str:
+    """
+    Publish a new catalogue version, called by the DataIngester whenever the vector
+    store content or the catalogue snapshot changes. Readers in other processes pick
+    it up on their next lookup.
+    """
+    version = version or f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    os.makedirs(os.path.dirname(Envs.CATALOGUE_VERSION_FILE) or ".", exist_ok=True)
+    tmp_path = Envs.CATALOGUE_VERSION_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, Envs.CATALOGUE_VERSION_FILE)
+    logger.info("published catalogue version", extra={"fields": {"version": version}})
+    return version
+
+
+def get_catalogue_version() -> str:
+    """Current catalogue version, re-read only when the version file changes."""
+    global _cached_version, _cached_mtime
+    try:
+        mtime = os.stat(Envs.CATALOGUE_VERSION_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return ""
+
+    if mtime != _cached_mtime:
+        with open(Envs.CATALOGUE_VERSION_FILE, "r", encoding="utf-8") as f:
+            _cached_version = f.read().strip()
+        _cached_mtime = mtime
+    return _cached_version
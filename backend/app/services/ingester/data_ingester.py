@@ -1,16 +1,21 @@
-from importlib import metadata
-from typing import List, Optional
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from langchain_core.documents import Document
 from langchain_core.vectorstores import VectorStore
 from langchain_text_splitters import TextSplitter
 import tqdm
 
 from app.pydantic_models.data_model import IndividualTest
+from app.services.embedder.batch_embedder import BatchEmbedder
+from app.services.embedder.cached_embedder import CachedEmbeddings
+from app.services.ingester.catalogue_snapshot import read_catalogue_snapshot, read_current_version, to_document, write_catalogue_snapshot
+from app.services.ingester.catalogue_version import publish_catalogue_version
+from app.services.ingester.ingest_manifest import IngestManifest, content_hash, document_id
+from app.services.ingester.ingest_pipeline import Stage, StagedPipeline
 from app.services.scraper.assessment_scraper import AssessmentScraper
 from app.services.scraper.catalogue_scraper import CatalogueScraper
 from app.services.text_splitter.factory import get_text_splitter
 from app.services.vector_store.factory import get_vector_store
-from app.utils.config import write_config
 from app.utils.envs import Envs
 
 
@@ -33,7 +38,9 @@ class DataIngester:
         end_at: int = 377,
         start_fresh: bool = False,
         batch_size: int = 12,
-        total_batches: int = 32
+        total_batches: int = 32,
+        manifest: Optional[IngestManifest] = None,
+        batch_embedder: Optional[BatchEmbedder] = None
     ) -> None:
         self.catalogue_scraper = catalogue_scraper
         self.assessment_scraper = assessment_scraper
@@ -44,71 +51,285 @@ class DataIngester:
         self.start_fresh = start_fresh
         self.batch_size = batch_size
         self.total_batches = total_batches
+        self.manifest = manifest if manifest is not None else IngestManifest(Envs.INGEST_MANIFEST_PATH)
+        self.batch_embedder = batch_embedder if batch_embedder is not None else self._default_batch_embedder()
+        self._stats_lock = threading.Lock()
     
     def _create_documents(self, tests: List[IndividualTest]) -> List[Document]:
-        all_docs: List[Document] = []
-        for test in tests:
-            all_docs.append(
-                Document(
-                    page_content=test.page_content,  # type: ignore
-                    metadata={
-                        "url": test.url,
-                        "name": test.name,
-                        "description": test.description,
-                        "adaptive_support": test.adaptive_support,
-                        "duration": test.duration,
-                        "remote_support": test.remote_support,
-                        "test_type": test.test_type                       
-                    }
-                )
-            )
-        return all_docs
-        
+        return [to_document(test) for test in tests]
     
-    def ingest_data(self):
+    def _assign_ids(self, docs: List[Document]) -> List[str]:
+        """Deterministic ids, the n-th chunk of an assessment always gets the same id."""
+        chunk_counts: Dict[str, int] = {}
+        ids = []
+        for doc in docs:
+            url = doc.metadata["url"]
+            chunk = chunk_counts.get(url, 0)
+            chunk_counts[url] = chunk + 1
+            ids.append(document_id(url, chunk))
+        return ids
+    
+    def _count(self, stats: Dict[str, int], key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            stats[key] += amount
+    
+    def _crawl_stage(self, seen_urls: Set[str]):
+        """Catalogue listing page -> its assessments, minus those a resumed run already processed."""
+        def crawl(page_url: str) -> List[IndividualTest]:
+            tests = self.catalogue_scraper.extract_individual_tests(page_url)
+            with self._stats_lock:
+                seen_urls.update(test.url for test in tests)
+            return [test for test in tests if not self.manifest.is_checkpointed(test.url)]
+        return crawl
+    
+    def _parse_stage(self, stats: Dict[str, int], scraped: Dict[str, IndividualTest]):
+        """Assessment -> its detail page parsed, recorded for the catalogue snapshot, then diffed."""
+        diff = self._diff_stage(stats)
+        def parse(test: IndividualTest) -> List[Tuple[IndividualTest, str]]:
+            self.assessment_scraper.extract_assessment_detail(test)
+            with self._stats_lock:
+                scraped[test.url] = test
+            return diff(test)
+        return parse
+    
+    def _diff_stage(self, stats: Dict[str, int]):
+        """Assessment -> (assessment, content hash). Unchanged ones are checkpointed and stop here."""
+        def diff(test: IndividualTest) -> List[Tuple[IndividualTest, str]]:
+            digest = content_hash(test)
+            if self.manifest.is_unchanged(test.url, digest):
+                self._count(stats, "unchanged")
+                self.manifest.checkpoint(test.url)
+                return []
+            return [(test, digest)]
+        return diff
+    
+    def _split(self, item: Tuple[IndividualTest, str]) -> List[Tuple[IndividualTest, str, List[Document], List[str]]]:
+        """Assessment -> its documents (chunks when splitting) and their deterministic ids."""
+        test, digest = item
+        docs = self._create_documents([test])
+        if self.text_splitter:
+            docs = self.text_splitter.split_documents(docs)
+        return [(test, digest, docs, self._assign_ids(docs))]
+    
+    def _default_batch_embedder(self) -> Optional[BatchEmbedder]:
         """
-        This method orchestrates the data ingestion process by scraping assessment data,
-        splitting the text, and storing it in the vector store in batches.
+        Vector store APIs embed inside `add_documents`, the only way to hand them precomputed
+        vectors is the embedding cache they read through. Without it there is no embed stage.
+        """
+        embeddings = getattr(self.vector_store, "embeddings", None)
+        if isinstance(embeddings, CachedEmbeddings):
+            return BatchEmbedder(embeddings)
+        print("Embedding cache is disabled, documents are embedded by the vector store on upsert.")
+        return None
+    
+    def _embed(self, items: List[Tuple[IndividualTest, str, List[Document], List[str]]]):
+        """Embed the documents of several assessments at once, ahead of the upsert stage."""
+        if self.batch_embedder is not None:
+            self.batch_embedder.embed_documents([doc.page_content for _, _, docs, _ in items for doc in docs])
+        return items
+    
+    def _upsert_stage(self, stats: Dict[str, int]):
+        """
+        Upsert a batch of new and changed assessments, drop chunks they no longer have, then
+        record them in the manifest and checkpoint them. Runs on a single worker: vector store
+        writes and snapshots are not thread-safe.
         
-        Supports resuming from specific batch in case of error/interruption.
+        The store is persisted and the catalogue version published once, when the run ends
+        (see `_run_pipeline`). Remote stores persist on upsert, so their manifest is saved
+        per batch; for in-process stores the manifest is saved together with the snapshot.
         """
-        curr_batch = self.start_from_batch
+        def upsert(batch: List[Tuple[IndividualTest, str, List[Document], List[str]]]) -> None:
+            docs = [doc for _, _, item_docs, _ in batch for doc in item_docs]
+            ids = [doc_id for _, _, _, item_ids in batch for doc_id in item_ids]
+            self.vector_store.add_documents(docs, ids=ids)
+            
+            stale_ids = [
+                doc_id
+                for test, _, _, new_ids in batch
+                for doc_id in self.manifest.ids(test.url) if doc_id not in new_ids
+            ]
+            if stale_ids:
+                self.vector_store.delete(ids=stale_ids)
+            
+            for test, digest, _, new_ids in batch:
+                self._count(stats, "updated" if self.manifest.ids(test.url) else "new")
+                self.manifest.update(test.url, digest, new_ids)
+                self.manifest.checkpoint(test.url)
+            # A saved manifest must never get ahead of the persisted store
+            if not self._persists_in_process():
+                self.manifest.save()
+        return upsert
+    
+    def _remove_missing(self, seen_urls: Set[str], stats: Dict[str, int]) -> bool:
+        """Delete assessments that are in the manifest but no longer in the catalogue."""
+        removed_urls = self.manifest.urls() - seen_urls
+        stale_ids = [doc_id for url in removed_urls for doc_id in self.manifest.ids(url)]
+        if stale_ids:
+            self.vector_store.delete(ids=stale_ids)
+        for url in removed_urls:
+            self.manifest.remove(url)
+        stats["removed"] += len(removed_urls)
+        return bool(removed_urls)
+    
+    def _commit_changes(self):
+        """Persist the store before the manifest, so a crash in between only causes a redundant upsert."""
+        self._persist_vector_store()
+        self.manifest.save()
+    
+    def _persists_in_process(self) -> bool:
+        return callable(getattr(self.vector_store, "persist", None))
+    
+    def _persist_vector_store(self):
+        """
+        Write a snapshot for in-process vector stores (remote stores persist on upsert)
+        and publish the new catalogue version, which invalidates cached API responses.
+        """
+        version = None
+        persist = getattr(self.vector_store, "persist", None)
+        if callable(persist):
+            version = persist()
+        publish_catalogue_version(version)
+    
+    def _run_pipeline(
+        self, stages: List[Stage], source: Iterable, seen_urls: Set[str], full_run: bool, stats: Dict[str, int]
+    ):
+        """
+        Run the source stages followed by split -> embed -> upsert, then drop assessments
+        missing from a full run and close the run in the manifest.
+        """
+        if self.start_fresh:
+            self.clear_data()
         
-        loop_start = self.start_from_batch * self.batch_size
-        loop_end = self.end_at
+        resumed = len(self.manifest.checkpointed())
+        if resumed:
+            print(f"Resuming data ingestion, skipping {resumed} checkpointed assessments.")
+        
+        pipeline = StagedPipeline(
+            stages=stages + [
+                Stage("split", self._split),
+                Stage("embed", self._embed, workers=Envs.INGEST_EMBED_WORKERS, batch_size=Envs.EMBEDDING_BATCH_SIZE),
+                Stage("upsert", self._upsert_stage(stats), batch_size=Envs.INGEST_UPSERT_BATCH_SIZE),
+            ],
+            queue_size=Envs.INGEST_QUEUE_SIZE
+        )
         
         try:
-            for page in tqdm.tqdm(range(loop_start, loop_end, self.batch_size), unit=("catalogue pages")):
-                url = Envs.SHL_PRODUCT_CATALOGUE_URL.format(page=page)
-                
-                tests = self.catalogue_scraper.extract_individual_tests(url)
-                self.assessment_scraper.extract_assessment_details(tests)
-                docs = self._create_documents(tests)
-                
-                if self.text_splitter:
-                    docs = self.text_splitter.split_documents(docs)
-                
-                self.vector_store.add_documents(docs)
-                
-                curr_batch += 1
-                
-                # Save progress in config.json
-                write_config({
-                    "DATA_INGESTION_START_FROM_BATCH": curr_batch,
-                    "DATA_INGESTION_END_AT": self.end_at
-                })
+            stage_stats = pipeline.run(source)
+            
+            self.manifest.finish_run()
+            removed = full_run and self._remove_missing(seen_urls, stats)
+            if removed or stats["new"] or stats["updated"]:
+                self._commit_changes()
+            else:
+                self.manifest.save()
             
-            print("Data ingestion completed.")
+            print(f"Data ingestion completed. {stats}")
+            print(f"Pipeline stages: {stage_stats}")
+            if self.batch_embedder is not None:
+                print(f"Embeddings: {self.batch_embedder.counters}")
         except Exception as e:
-            print(f"Data ingestion interrupted at batch {curr_batch}, page {curr_batch+1}. Error: {e}")
-            # Save progress in config.json
-            write_config({
-                "DATA_INGESTION_START_FROM_BATCH": curr_batch,
-                "DATA_INGESTION_END_AT": self.end_at
-            })
+            print(f"Data ingestion interrupted after {len(self.manifest.checkpointed())} assessments. Error: {e}")
+            # Keep the checkpoint, the next run picks up from there
+            if stats["new"] or stats["updated"]:
+                self._commit_changes()
+            else:
+                self.manifest.save()
             raise e
     
+    def ingest_data(self):
+        """
+        This method orchestrates the data ingestion process by scraping assessment data,
+        splitting the text, and storing it in the vector store.
+        
+        The work runs as a pipeline of stages connected by bounded queues, so fetching detail
+        pages, embedding and upserting overlap instead of running one batch at a time:
+        crawl (catalogue pages) -> parse (detail pages) -> split -> embed -> upsert.
+        Full queues block the stages before them, which keeps memory flat when a stage is slow.
+        
+        Ingestion is incremental: documents get ids derived from the assessment URL and
+        only assessments whose content hash differs from the ingest manifest are embedded
+        and upserted. Assessments that left the catalogue are deleted, on full runs only
+        (starting from batch 0), since a partial run does not see the whole catalogue.
+        
+        Every processed assessment is checkpointed in the manifest, an interrupted run
+        resumes by skipping the checkpointed ones. The checkpoint is cleared once a run completes.
+        
+        The scraped assessments are written to a catalogue snapshot, see `ingest_snapshot`.
+        """
+        loop_start = self.start_from_batch * self.batch_size
+        full_run = self.start_from_batch == 0
+        seen_urls: Set[str] = set()
+        scraped: Dict[str, IndividualTest] = {}
+        stats = {"new": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        
+        page_urls = [
+            Envs.SHL_PRODUCT_CATALOGUE_URL.format(page=page)
+            for page in range(loop_start, self.end_at, self.batch_size)
+        ]
+        self._run_pipeline(
+            stages=[
+                Stage("crawl", self._crawl_stage(seen_urls), workers=Envs.INGEST_CRAWL_WORKERS),
+                Stage("parse", self._parse_stage(stats, scraped), workers=Envs.INGEST_PARSE_WORKERS),
+            ],
+            source=tqdm.tqdm(page_urls, unit=("catalogue pages")),
+            seen_urls=seen_urls,
+            full_run=full_run,
+            stats=stats
+        )
+        self._write_snapshot(scraped, seen_urls, full_run)
+        
+        http_cache = self.assessment_scraper.http_cache
+        if http_cache is not None:
+            print(f"HTTP cache: {http_cache.counters}")
+    
+    def _write_snapshot(self, scraped: Dict[str, IndividualTest], seen_urls: Set[str], full_run: bool):
+        """
+        Snapshot the catalogue after a scrape. Assessments this run did not parse (checkpointed
+        by an interrupted run, or outside a partial run) keep their record from the previous snapshot.
+        """
+        records = {test.url: test for test in read_catalogue_snapshot(Envs.CATALOGUE_SNAPSHOT_DIR)}
+        if full_run:
+            records = {url: test for url, test in records.items() if url in seen_urls}
+        records.update(scraped)
+        
+        missing = len(seen_urls - set(records))
+        if missing:
+            print(f"Catalogue snapshot not written, {missing} assessments were neither scraped nor in the previous snapshot.")
+            return
+        previous_version = read_current_version(Envs.CATALOGUE_SNAPSHOT_DIR)
+        version = write_catalogue_snapshot(Envs.CATALOGUE_SNAPSHOT_DIR, records.values(), Envs.CATALOGUE_SNAPSHOT_KEEP_VERSIONS)
+        if version != previous_version:
+            # The catalogue BM25 index is built from the snapshot, a new catalogue version makes API workers rebuild it
+            publish_catalogue_version()
+    
+    def ingest_snapshot(self, version: Optional[str] = None):
+        """
+        Build the vector store from a catalogue snapshot (the current one by default) instead of
+        scraping, without any network call besides embedding. Goes through the same diff, split,
+        embed and upsert stages as `ingest_data`, so with `start_fresh` it rebuilds the store,
+        e.g. after an embedding or splitter change, and otherwise it syncs the store to the snapshot.
+        """
+        tests = read_catalogue_snapshot(Envs.CATALOGUE_SNAPSHOT_DIR, version)
+        if not tests:
+            raise ValueError(f"No catalogue snapshot found in {Envs.CATALOGUE_SNAPSHOT_DIR}, run a scraping ingestion first")
+        
+        seen_urls = {test.url for test in tests}
+        stats = {"new": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        self._run_pipeline(
+            stages=[Stage("diff", self._diff_stage(stats))],
+            # Filtered lazily, `start_fresh` clears the checkpoint once the pipeline starts
+            source=(test for test in tests if not self.manifest.is_checkpointed(test.url)),
+            seen_urls=seen_urls,
+            full_run=True,
+            stats=stats
+        )
+    
     def clear_data(self):
-        """Clears all data from the vector store."""
-        self.vector_store.delete(delete_ALL=True)
+        """
+        Clears all data from the vector store, then the manifest. If the store delete fails
+        the manifest is kept, so the next incremental run does not re-upsert into a full store.
+        """
+        self.vector_store.delete(delete_all=True)
+        self.manifest.clear()
+        self._commit_changes()
         print("Cleared all data from the vector store.")
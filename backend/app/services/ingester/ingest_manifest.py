@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Dict, List, Optional, Set
+
+from app.pydantic_models.data_model import IndividualTest
+
+
+def document_id(url: str, chunk: int = 0) -> str:
+    """Deterministic vector store id of an assessment (or of its n-th chunk), derived from its URL."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, url if chunk == 0 else f"{url}#{chunk}"))
+
+
+def content_hash(test: IndividualTest) -> str:
+    """Hash of everything that ends up in the vector store for an assessment, page content included."""
+    payload = {"page_content": test.page_content, **test.model_dump()}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class IngestManifest:
+    """
+    Local record of what is in the vector store: for each assessment URL, the content
+    hash it was ingested with and the ids of its documents. Comparing fresh hashes with
+    the manifest tells which assessments are new, changed, unchanged or removed.
+
+    It also holds the checkpoint of an unfinished run, the assessments already processed,
+    so a resumed run skips them. Safe to update from several pipeline threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, Dict] = {}
+        self._checkpoint: Set[str] = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries = data.get("assessments", {})
+            self._checkpoint = set(data.get("checkpoint", []))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def urls(self) -> Set[str]:
+        with self._lock:
+            return set(self._entries)
+
+    def is_unchanged(self, url: str, digest: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(url)
+            return entry is not None and entry["hash"] == digest
+
+    def ids(self, url: str) -> List[str]:
+        with self._lock:
+            entry = self._entries.get(url)
+            return list(entry["ids"]) if entry else []
+
+    def update(self, url: str, digest: str, ids: List[str]) -> None:
+        with self._lock:
+            self._entries[url] = {"hash": digest, "ids": ids}
+
+    def remove(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            return self._entries.pop(url, None)
+
+    def is_checkpointed(self, url: str) -> bool:
+        with self._lock:
+            return url in self._checkpoint
+
+    def checkpoint(self, url: str) -> None:
+        """Mark an assessment as processed by the current run."""
+        with self._lock:
+            self._checkpoint.add(url)
+
+    def checkpointed(self) -> Set[str]:
+        with self._lock:
+            return set(self._checkpoint)
+
+    def finish_run(self) -> None:
+        """The run completed, the next one starts from scratch."""
+        with self._lock:
+            self._checkpoint = set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._checkpoint = set()
+
+    def save(self) -> None:
+        """Write the manifest atomically, an interrupted run keeps the previous manifest."""
+        with self._lock:
+            data = {"assessments": self._entries, "checkpoint": sorted(self._checkpoint)}
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,147 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of an ingestion pipeline, run by `workers` threads.
+    `fn` takes an item, or a list of up to `batch_size` items when a batch size is given,
+    and returns an iterable of items for the next stage, possibly empty.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Optional[Iterable[Any]]],
+        workers: int = 1,
+        batch_size: Optional[int] = None
+    ):
+        self.name = name
+        self.fn = fn
+        self.workers = max(workers, 1)
+        self.batched = batch_size is not None
+        self.batch_size = max(batch_size or 1, 1)
+        self.items = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _record(self, items: int, seconds: float) -> None:
+        with self._lock:
+            self.items += items
+            self.busy_seconds += seconds
+
+
+class StagedPipeline:
+    """
+    Threaded producer/consumer pipeline: a source feeds the first stage and every stage
+    feeds the next through a bounded queue. Full queues block their producers, so a slow
+    stage (e.g. an embedding quota) throttles the crawl instead of buffering the whole catalogue.
+    The first error stops every stage and is re-raised by `run`.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int):
+        self.stages = stages
+        self.queue_size = queue_size
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def _put(self, target: "queue.Queue", item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: "queue.Queue") -> Any:
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error: BaseException) -> None:
+        self._errors.append(error)
+        self._stop.set()
+
+    def _next_batch(self, stage: Stage, inbox: "queue.Queue") -> List[Any]:
+        """Block for one item, then take whatever else is already queued, up to the batch size."""
+        first = self._get(inbox)
+        if first is _DONE:
+            return []
+        batch = [first]
+        while len(batch) < stage.batch_size:
+            try:
+                item = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                inbox.put(_DONE)
+                break
+            batch.append(item)
+        return batch
+
+    def _work(self, stage: Stage, inbox: "queue.Queue", outbox: Optional["queue.Queue"], finished: List[int]) -> None:
+        try:
+            while not self._stop.is_set():
+                batch = self._next_batch(stage, inbox)
+                if not batch:
+                    # Let the sibling workers see the end of the stream too
+                    inbox.put(_DONE)
+                    break
+                start = time.perf_counter()
+                outputs = stage.fn(batch if stage.batched else batch[0])
+                for output in outputs or ():
+                    if outbox is not None and not self._put(outbox, output):
+                        return
+                stage._record(len(batch), time.perf_counter() - start)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            with stage._lock:
+                finished[0] += 1
+                last = finished[0] == stage.workers
+            if last and outbox is not None:
+                self._put(outbox, _DONE)
+
+    def run(self, source: Iterable[Any]) -> Dict[str, Dict[str, float]]:
+        """Feed `source` through every stage and wait for the pipeline to drain. Returns per-stage stats."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        for idx, stage in enumerate(self.stages):
+            outbox = queues[idx + 1] if idx + 1 < len(self.stages) else None
+            finished = [0]
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[idx], outbox, finished),
+                    name=f"ingest-{stage.name}-{worker}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in source:
+                if not self._put(queues[0], item):
+                    break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(queues[0], _DONE)
+            for thread in threads:
+                thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+        return {
+            stage.name: {"items": stage.items, "busy_seconds": round(stage.busy_seconds, 2)}
+            for stage in self.stages
+        }
@@ -1,17 +1,40 @@
 from langchain_core.language_models import BaseChatModel
 
-from app.services.llm.google_llm import google_llm
-from app.services.llm.groq_llm import groq_llm
 from app.utils.envs import Envs
+from app.utils.registry import LazyRegistry
 
 
-_PROVIDER_MAP = {
-    "google": google_llm,
-    "groq": groq_llm,
-}
+# Only the configured provider's client is imported and built, on first use
+_PROVIDER_MAP = LazyRegistry({
+    "google": "app.services.llm.google_llm:google_llm",
+    "groq": "app.services.llm.groq_llm:groq_llm",
+})
 
-def get_llm() -> BaseChatModel:
+_CHAT_MODEL_MAP = LazyRegistry({
+    "google": "app.services.llm.google_llm:google_chat_model",
+    "groq": "app.services.llm.groq_llm:groq_chat_model",
+})
+
+_MODEL_NAME_MAP = LazyRegistry({
+    "google": "app.services.llm.google_llm:GOOGLE_LLM_MODEL",
+    "groq": "app.services.llm.groq_llm:GROQ_LLM_MODEL",
+})
+
+def _get_provider() -> str:
     provider = (getattr(Envs, "LLM_PROVIDER", None) or "groq").lower()
     if provider not in _PROVIDER_MAP:
         raise ValueError(f"Unsupported LLM provider: {provider}")
-    return _PROVIDER_MAP[provider]
+    return provider
+
+def get_llm() -> BaseChatModel:
+    """LLM bound to the query rewrite structured output."""
+    return _PROVIDER_MAP[_get_provider()]
+
+def get_chat_model() -> BaseChatModel:
+    """Plain chat model of the configured provider, for free-form prompts."""
+    return _CHAT_MODEL_MAP[_get_provider()]
+
+def get_llm_name() -> str:
+    """Provider and model of the configured LLM, e.g. `groq:openai/gpt-oss-120b`."""
+    provider = _get_provider()
+    return f"{provider}:{_MODEL_NAME_MAP[provider]}"
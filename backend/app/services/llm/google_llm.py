@@ -4,6 +4,8 @@ from app.pydantic_models.data_model import LLMStructuredOutput
 from app.utils.envs import Envs
 
 
+GOOGLE_LLM_MODEL = "google_genai:gemini-2.5-flash-lite"
+
 os.environ["GOOGLE_API_KEY"] = Envs.GOOGLE_API_KEY
-google_llm = init_chat_model("google_genai:gemini-2.5-flash-lite")
-google_llm = google_llm.with_structured_output(LLMStructuredOutput)
+google_chat_model = init_chat_model(GOOGLE_LLM_MODEL)
+google_llm = google_chat_model.with_structured_output(LLMStructuredOutput)
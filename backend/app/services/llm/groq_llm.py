@@ -4,6 +4,8 @@ from app.pydantic_models.data_model import LLMStructuredOutput
 from app.utils.envs import Envs
 
 
+GROQ_LLM_MODEL = "openai/gpt-oss-120b"
+
 os.environ["GROQ_API_KEY"] = Envs.GROQ_API_KEY
-groq_llm = ChatGroq(model="openai/gpt-oss-120b", temperature=0.7, max_retries=3)
-groq_llm = groq_llm.with_structured_output(LLMStructuredOutput)
+groq_chat_model = ChatGroq(model=GROQ_LLM_MODEL, temperature=0.7, max_retries=3)
+groq_llm = groq_chat_model.with_structured_output(LLMStructuredOutput)
@@ -0,0 +1,61 @@
+import hashlib
+import os
+from typing import Optional
+
+from app.constants.strings import REWRITE_AND_INFER_SYS_PROMPT
+from app.pydantic_models.data_model import TransformedQuery
+from app.utils.cache import TieredCache, make_cache_key, normalize_text
+from app.utils.envs import Envs
+from app.utils.metrics import REGISTRY
+
+
+class TransformedQueryCache:
+    """
+    Memoizes QueryTransformer results keyed on the normalized query text, a hash of the
+    system prompt and the LLM model, so a prompt or model change never serves stale rewrites.
+    Entries expire after a TTL and the least recently used are evicted first.
+    The disk tier is shared by the API, the Evaluator and TestSetRecommendation.
+    """
+
+    def __init__(self, cache: TieredCache, model_name: str, prompt: str = REWRITE_AND_INFER_SYS_PROMPT):
+        self.cache = cache
+        self.model_name = model_name
+        self.prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def _key(self, query: str) -> str:
+        return make_cache_key(self.model_name, self.prompt_hash, normalize_text(query))
+
+    def get(self, query: str) -> Optional[TransformedQuery]:
+        cached = self.cache.get(self._key(query))
+        # Hand out a copy so callers cannot mutate the cached entry
+        return cached.model_copy(deep=True) if cached is not None else None
+
+    def set(self, query: str, transformed_query: TransformedQuery) -> None:
+        self.cache.set(self._key(query), transformed_query)
+
+
+_query_cache: Optional[TransformedQueryCache] = None
+
+
+def get_query_cache() -> Optional[TransformedQueryCache]:
+    """Returns the shared query cache, or None unless QUERY_CACHE_ENABLED is set."""
+    global _query_cache
+    if not Envs.QUERY_CACHE_ENABLED:
+        return None
+
+    if _query_cache is None:
+        from app.services.llm.factory import get_llm_name
+
+        _query_cache = TransformedQueryCache(
+            cache=REGISTRY.register_cache(TieredCache(
+                name="transformed_queries",
+                max_size=Envs.QUERY_CACHE_SIZE,
+                dumps=lambda query: query.model_dump_json().encode("utf-8"),
+                loads=TransformedQuery.model_validate_json,
+                disk_path=os.path.join(Envs.CACHE_DIR, "transformed_queries.sqlite"),
+                max_disk_entries=Envs.QUERY_CACHE_DISK_ENTRIES,
+                ttl=Envs.QUERY_CACHE_TTL
+            )),
+            model_name=get_llm_name()
+        )
+    return _query_cache
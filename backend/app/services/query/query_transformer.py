@@ -1,29 +1,76 @@
-import json
+from typing import List, Optional, Union
 from langchain_core.language_models import BaseChatModel
 
 from app.constants.strings import REWRITE_AND_INFER_SYS_PROMPT
 from app.pydantic_models.data_model import LLMStructuredOutput, PreferredIntent, TransformedQuery
+from app.services.query.query_cache import TransformedQueryCache
 
 
 class QueryTransformer:
     
-    def __init__(self, llm: BaseChatModel) -> None:
+    def __init__(self, llm: BaseChatModel, cache: Optional[TransformedQueryCache] = None) -> None:
         self.llm = llm
+        self.cache = cache
     
-    def rewrite_and_infer(self, query: str) -> TransformedQuery:
-        response = self.llm.invoke(
-            [
-                {"role": "system", "content": REWRITE_AND_INFER_SYS_PROMPT},
-                {"role": "user", "content": query}
-            ]
-        )
+    def _messages(self, query: str) -> list:
+        return [
+            {"role": "system", "content": REWRITE_AND_INFER_SYS_PROMPT},
+            {"role": "user", "content": query}
+        ]
 
+    def _to_transformed_query(self, query: str, response) -> TransformedQuery:
         content: LLMStructuredOutput = response.content if hasattr(response, "content") else response  # type: ignore
 
-        return TransformedQuery(
+        transformed_query = TransformedQuery(
             rewritten_query=content.rewritten_query,
             preferred_intent=PreferredIntent(
                 preferred_test_types=content.preferred_test_types,
                 duration_preference=content.duration_preference
             )
-        )
\ No newline at end of file
+        )
+
+        if self.cache is not None:
+            self.cache.set(query, transformed_query)
+
+        return transformed_query
+
+    def _from_cache(self, query: str) -> Optional[TransformedQuery]:
+        return self.cache.get(query) if self.cache is not None else None
+
+    def rewrite_and_infer(self, query: str) -> TransformedQuery:
+        cached = self._from_cache(query)
+        if cached is not None:
+            return cached
+
+        response = self.llm.invoke(self._messages(query))
+        return self._to_transformed_query(query, response)
+
+    async def arewrite_and_infer(self, query: str) -> TransformedQuery:
+        cached = self._from_cache(query)
+        if cached is not None:
+            return cached
+
+        response = await self.llm.ainvoke(self._messages(query))
+        return self._to_transformed_query(query, response)
+
+    async def abatch_rewrite_and_infer(
+        self, queries: List[str], max_concurrency: int
+    ) -> List[Union[TransformedQuery, Exception]]:
+        """
+        Rewrite several queries with one `abatch` call, at most `max_concurrency` LLM calls in flight.
+        Cached queries skip the LLM, a failed query yields its exception instead of failing the batch.
+        """
+        results: List[Union[TransformedQuery, Exception, None]] = [self._from_cache(query) for query in queries]
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if missing:
+            responses = await self.llm.abatch(
+                [self._messages(queries[idx]) for idx in missing],
+                config={"max_concurrency": max_concurrency},
+                return_exceptions=True
+            )
+            for idx, response in zip(missing, responses):
+                if isinstance(response, Exception):
+                    results[idx] = response
+                else:
+                    results[idx] = self._to_transformed_query(queries[idx], response)
+        return results  # type: ignore
@@ -0,0 +1,70 @@
+from typing import List, Optional, Sequence
+
+from langchain_core.documents import Document
+
+from app.services.retriever.vector_search import retrieval_scores
+from app.utils.envs import Envs
+
+
+class CandidateBudget:
+    """
+    Per-query rerank budget: how many retrieved candidates go to the reranker, the best scored
+    ones, kept in retrieval order. It is read from the distribution of the retrieval scores the
+    candidates carry (similarity, or fused score for the hybrid retriever), scaled to its spread
+    (best - worst score) so it does not depend on the score range of the store:
+    - gap: a drop of at least `gap_ratio` of the spread between two consecutive scores
+      separates the confident head from the rest, only the head is reranked
+    - plateau: candidates past the rank where the remaining scores are within
+      `plateau_ratio` of the spread from the worst one are indistinguishable, they are cut
+    The budget is the smaller of both, never below `min_candidates`. Scores spread less
+    than `min_spread` give no signal, and the whole candidate list is reranked.
+    """
+
+    def __init__(
+        self,
+        min_candidates: int = Envs.ADAPTIVE_MIN_CANDIDATES,
+        gap_ratio: float = Envs.ADAPTIVE_GAP_RATIO,
+        plateau_ratio: float = Envs.ADAPTIVE_PLATEAU_RATIO,
+        min_spread: float = Envs.ADAPTIVE_MIN_SPREAD
+    ):
+        self.min_candidates = min_candidates
+        self.gap_ratio = gap_ratio
+        self.plateau_ratio = plateau_ratio
+        self.min_spread = min_spread
+
+    def size(self, scores: Sequence[float], available: int) -> int:
+        """Number of candidates to rerank out of `available`, given their retrieval scores."""
+        if available <= self.min_candidates or len(scores) < 2:
+            return available
+        ranked = sorted(scores, reverse=True)
+        spread = ranked[0] - ranked[-1]
+        if spread < self.min_spread:
+            return available
+
+        gaps = [ranked[rank] - ranked[rank + 1] for rank in range(len(ranked) - 1)]
+        widest = max(range(len(gaps)), key=gaps.__getitem__)
+        gap_cut = widest + 1 if gaps[widest] >= self.gap_ratio * spread else len(ranked)
+
+        plateau_cut = next(
+            rank for rank, score in enumerate(ranked) if score - ranked[-1] <= self.plateau_ratio * spread
+        )
+        return max(self.min_candidates, min(gap_cut, plateau_cut, available))
+
+    def _cut(self, docs: List[Document], scores: Optional[List[float]]) -> List[Document]:
+        if scores is None:
+            # Without retrieval scores there is nothing to adapt to, the fixed budget applies
+            return docs
+        size = self.size(scores, len(docs))
+        if size >= len(docs):
+            return docs
+        # Retrieval order is not score order (MMR trades relevance for diversity), so the cut keeps
+        # the best scored candidates, ties going to the earlier one, and not a prefix
+        best = sorted(range(len(docs)), key=lambda idx: -scores[idx])[:size]
+        return [docs[idx] for idx in sorted(best)]
+
+    def select(self, docs: List[Document]) -> List[Document]:
+        """
+        Candidates to rerank, cut on the retrieval scores attached to them. When a candidate has
+        none (MMR on Pinecone does not return scores), every candidate is reranked.
+        """
+        return self._cut(docs, retrieval_scores(docs))
@@ -1,12 +1,83 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import time
 from pprint import pprint
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.documents import Document
 
-from app.pydantic_models.data_model import IndividualTest
+from app.pydantic_models.data_model import IndividualTest, TransformedQuery
 from app.services.balancer.balancer import ResultBalancer
+from app.services.recommender.candidate_budget import CandidateBudget
 from app.services.query.query_transformer import QueryTransformer
 from app.services.reranker.base_reranker import BaseReranker
+from app.services.retriever.metadata_filter import FILTER_MODES, build_metadata_filter, matches_filter
+from app.services.retriever.vector_search import (
+    RETRIEVAL_SCORE_KEY,
+    aretrieve_by_vector,
+    filtered_search_kwargs,
+    get_query_embeddings,
+    retrieval_scores,
+    with_retrieval_score,
+)
+from app.utils.envs import Envs
+from app.utils.logger import get_logger
+from app.utils.metrics import UPSTREAM_ERRORS, stage_span
+
+
+logger = get_logger(__name__)
+
+
+# Runs the raw query retrieval of sync requests while the rewrite is in flight
+_speculative_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-retrieval")
+
+
+def merge_candidates(primary: List[Document], secondary: List[Document]) -> List[Document]:
+    """Primary candidates in order, followed by secondary candidates of assessments not seen yet."""
+    seen = {doc.metadata.get("url") or doc.page_content for doc in primary}
+    merged = list(primary)
+    for doc in secondary:
+        key = doc.metadata.get("url") or doc.page_content
+        if key not in seen:
+            seen.add(key)
+            merged.append(doc)
+    return merged
+
+
+def backfill_candidates(filtered: List[Document], unfiltered: List[Document], k: int) -> List[Document]:
+    """
+    Filtered results topped up with unfiltered ones, up to `k`. The backfilled documents
+    score no higher than the worst filtered one, so the candidate budget does not rank them
+    above assessments that match the intent.
+    """
+    merged = merge_candidates(filtered, unfiltered)[:k]
+    filtered_scores = retrieval_scores(filtered)
+    if not filtered_scores:
+        return merged
+    floor = min(filtered_scores)
+    return filtered + [
+        with_retrieval_score(doc, min(doc.metadata.get(RETRIEVAL_SCORE_KEY, floor), floor))
+        for doc in merged[len(filtered):]
+    ]
+
+
+def _unfiltered(search_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in search_kwargs.items() if key != "filter"}
+
+
+def _lap(start: float) -> Tuple[float, float]:
+    """Current time and the milliseconds elapsed since `start`."""
+    now = time.perf_counter()
+    return now, round((now - start) * 1000, 2)
+
+
+def _log_completed(
+    retrieved: List[Document], candidates: List[Document], reranked: List[Tuple[Document, float]], balanced: List[Document]
+) -> None:
+    logger.info("recommendation completed", extra={"fields": {
+        "retrieved": len(retrieved), "rerank_candidates": len(candidates),
+        "reranked": len(reranked), "recommended": len(balanced)
+    }})
 
 
 class Recommender:
@@ -20,29 +91,274 @@ class Recommender:
         query_transformer: QueryTransformer, 
         retriever: BaseRetriever, 
         reranker: BaseReranker, 
-        balancer: ResultBalancer
+        balancer: ResultBalancer,
+        speculative_retrieval: bool = False,
+        filter_mode: str = "off",
+        candidate_budget: Optional[CandidateBudget] = None
     ):
+        if filter_mode not in FILTER_MODES:
+            raise ValueError(f"Unsupported RETRIEVAL_FILTER_MODE: {filter_mode}")
         self.query_transformer = query_transformer
         self.retriever = retriever
         self.reranker = reranker
         self.balancer = balancer
+        # Retrieve on the raw query while the LLM rewrite runs, then merge both candidate sets
+        self.speculative_retrieval = speculative_retrieval
+        # How the inferred intent restricts the dense search:
+        # - off: it does not, the balancer alone applies the intent
+        # - soft: matching assessments first, backfilled with unfiltered results when too few match
+        # - hard: only matching assessments are retrieved
+        self.filter_mode = filter_mode
+        # Adaptive rerank budget read from the retrieval scores, None reranks every retrieved candidate
+        self.candidate_budget = candidate_budget
+    
+    def _filter_search_kwargs(self, transformed_query: TransformedQuery) -> Dict[str, Any]:
+        """Search kwargs pushing the inferred intent into the vector search, empty when nothing is filtered."""
+        if self.filter_mode == "off":
+            return {}
+        metadata_filter = build_metadata_filter(transformed_query.preferred_intent)
+        if metadata_filter is None:
+            return {}
+        return filtered_search_kwargs(self.retriever, metadata_filter, Envs.FILTERED_TOP_K, Envs.FILTERED_FETCH_K)
+    
+    def _log_filter(self, search_kwargs: Dict[str, Any]) -> None:
+        if search_kwargs:
+            logger.debug("metadata filter", extra={"fields": {"mode": self.filter_mode, "filter": search_kwargs["filter"]}})
+    
+    def _needs_backfill(self, retrieved_tests: List[Document], search_kwargs: Dict[str, Any]) -> bool:
+        return self.filter_mode == "soft" and bool(search_kwargs) and len(retrieved_tests) < search_kwargs["k"]
+    
+    def _merge_speculative(
+        self, retrieved_tests: List[Document], speculative_tests: List[Document], transformed_query: TransformedQuery
+    ) -> List[Document]:
+        # The raw query is searched before the intent is known, so a hard filter is applied afterwards
+        if self.filter_mode == "hard":
+            metadata_filter = build_metadata_filter(transformed_query.preferred_intent)
+            speculative_tests = [doc for doc in speculative_tests if matches_filter(doc.metadata, metadata_filter)]
+        return merge_candidates(retrieved_tests, speculative_tests)
+    
+    def _speculative_failed(self, error: Exception) -> List[Document]:
+        """The speculative search only adds recall, a failure leaves the request with the rewritten query's candidates."""
+        UPSTREAM_ERRORS.inc(upstream="vector_store")
+        logger.warning("speculative retrieval failed, continuing without it", extra={"fields": {"error": repr(error)}})
+        return []
+    
+    def _speculative_result(self, speculative_tests: "Future[List[Document]]") -> List[Document]:
+        try:
+            return speculative_tests.result()
+        except Exception as e:
+            return self._speculative_failed(e)
+    
+    async def _aspeculative_result(self, speculative_tests: "asyncio.Task[List[Document]]") -> List[Document]:
+        try:
+            return await speculative_tests
+        except Exception as e:
+            return self._speculative_failed(e)
+    
+    def _retrieve(self, transformed_query: TransformedQuery) -> List[Document]:
+        query = transformed_query.rewritten_query
+        search_kwargs = self._filter_search_kwargs(transformed_query)
+        self._log_filter(search_kwargs)
+        retrieved_tests = self.retriever.invoke(query, **search_kwargs)
+        if self._needs_backfill(retrieved_tests, search_kwargs):
+            unfiltered_tests = self.retriever.invoke(query, **_unfiltered(search_kwargs))
+            retrieved_tests = backfill_candidates(retrieved_tests, unfiltered_tests, search_kwargs["k"])
+        return retrieved_tests
+    
+    async def _aretrieve(
+        self, transformed_query: TransformedQuery, embedding: Optional[List[float]] = None
+    ) -> List[Document]:
+        """Async `_retrieve`, searching with `embedding` when the query was embedded beforehand."""
+        query = transformed_query.rewritten_query
+        
+        async def search(**search_kwargs: Any) -> List[Document]:
+            if embedding is not None:
+                return await aretrieve_by_vector(self.retriever, query, embedding, **search_kwargs)
+            return await self.retriever.ainvoke(query, **search_kwargs)
+        
+        search_kwargs = self._filter_search_kwargs(transformed_query)
+        self._log_filter(search_kwargs)
+        retrieved_tests = await search(**search_kwargs)
+        if self._needs_backfill(retrieved_tests, search_kwargs):
+            unfiltered_tests = await search(**_unfiltered(search_kwargs))
+            retrieved_tests = backfill_candidates(retrieved_tests, unfiltered_tests, search_kwargs["k"])
+        return retrieved_tests
+    
+    def _log_budget(self, retrieved_tests: List[Document], candidates: List[Document]) -> None:
+        logger.debug("candidate budget", extra={"fields": {"retrieved": len(retrieved_tests), "rerank_candidates": len(candidates)}})
+    
+    def _select_candidates(self, retrieved_tests: List[Document]) -> List[Document]:
+        """Retrieved candidates that go to the reranker, cut on the scores retrieval attached to them."""
+        if self.candidate_budget is None:
+            return retrieved_tests
+        candidates = self.candidate_budget.select(retrieved_tests)
+        self._log_budget(retrieved_tests, candidates)
+        return candidates
     
     def recommend(self, user_query: str) -> List[Document]:
-        print("User Query transforming...")
-        transformed_query = self.query_transformer.rewrite_and_infer(user_query)
-        print("Transformed Query:", transformed_query, ", retrieving tests...")
-        retrieved_tests = self.retriever.invoke(
-            transformed_query.rewritten_query
-        )
-        print(f"Retrieved {len(retrieved_tests)} tests, reranking...")
-        reranked_tests = self.reranker.rerank(
-            transformed_query.rewritten_query,
-            retrieved_tests
-        )
-        print(f"Reranked {len(reranked_tests)} tests, displaying...")
-        balanced_tests = self.balancer.balance_selection(
-            reranked_tests,
-            transformed_query.preferred_intent
-        )
+        speculative_tests = None
+        if self.speculative_retrieval:
+            speculative_tests = _speculative_executor.submit(self.retriever.invoke, user_query)
+        with stage_span("rewrite", upstream="llm"):
+            transformed_query = self.query_transformer.rewrite_and_infer(user_query)
+        logger.debug("query transformed", extra={"fields": {"rewritten_query": transformed_query.rewritten_query}})
+        with stage_span("retrieve", upstream="vector_store"):
+            retrieved_tests = self._retrieve(transformed_query)
+            if speculative_tests is not None:
+                retrieved_tests = self._merge_speculative(
+                    retrieved_tests, self._speculative_result(speculative_tests), transformed_query
+                )
+            candidate_tests = self._select_candidates(retrieved_tests)
+        with stage_span("rerank", upstream="reranker"):
+            reranked_tests = self.reranker.rerank(
+                transformed_query.rewritten_query,
+                candidate_tests
+            )
+        with stage_span("balance"):
+            balanced_tests = self.balancer.balance_selection(
+                reranked_tests,
+                transformed_query.preferred_intent
+            )
+        _log_completed(retrieved_tests, candidate_tests, reranked_tests, balanced_tests)
         
         return balanced_tests
+    
+    async def arecommend(self, user_query: str) -> List[Document]:
+        """
+        Async variant of `recommend`, the LLM, retriever and reranker calls are awaited
+        so an in-flight request does not hold a threadpool slot while waiting on the network.
+        """
+        balanced_tests: List[Document] = []
+        async for event in self.astream_recommend(user_query):
+            if event["stage"] == "recommendations":
+                balanced_tests = event["documents"]
+        return balanced_tests
+    
+    async def astream_recommend(self, user_query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Runs the async pipeline and yields an event as soon as each stage has a result:
+        - intent: the transformed query
+        - candidates: retrieved documents in dense retrieval order
+        - recommendations: the reranked and balanced documents
+        Every event carries the duration of the stages it covers in `stage_ms`.
+        """
+        stage_start = time.perf_counter()
+        speculative_tests = None
+        if self.speculative_retrieval:
+            speculative_tests = asyncio.create_task(self.retriever.ainvoke(user_query))
+        try:
+            with stage_span("rewrite", upstream="llm"):
+                transformed_query = await self.query_transformer.arewrite_and_infer(user_query)
+        except BaseException:
+            if speculative_tests is not None:
+                speculative_tests.cancel()
+            raise
+        stage_start, elapsed = _lap(stage_start)
+        logger.debug("query transformed", extra={"fields": {"rewritten_query": transformed_query.rewritten_query}})
+        yield {"stage": "intent", "stage_ms": {"rewrite": elapsed}, "transformed_query": transformed_query}
+        
+        stage_start = time.perf_counter()
+        with stage_span("retrieve", upstream="vector_store"):
+            try:
+                retrieved_tests = await self._aretrieve(transformed_query)
+            except BaseException:
+                if speculative_tests is not None:
+                    speculative_tests.cancel()
+                raise
+            if speculative_tests is not None:
+                retrieved_tests = self._merge_speculative(
+                    retrieved_tests, await self._aspeculative_result(speculative_tests), transformed_query
+                )
+            candidate_tests = self._select_candidates(retrieved_tests)
+        stage_start, elapsed = _lap(stage_start)
+        yield {"stage": "candidates", "stage_ms": {"retrieve": elapsed}, "documents": retrieved_tests}
+        
+        stage_start = time.perf_counter()
+        with stage_span("rerank", upstream="reranker"):
+            reranked_tests = await self.reranker.arerank(
+                transformed_query.rewritten_query,
+                candidate_tests
+            )
+        stage_start, rerank_elapsed = _lap(stage_start)
+        with stage_span("balance"):
+            balanced_tests = self.balancer.balance_selection(
+                reranked_tests,
+                transformed_query.preferred_intent
+            )
+        _, elapsed = _lap(stage_start)
+        _log_completed(retrieved_tests, candidate_tests, reranked_tests, balanced_tests)
+        yield {
+            "stage": "recommendations",
+            "stage_ms": {"rerank": rerank_elapsed, "balance": elapsed},
+            "documents": balanced_tests
+        }
+    
+    async def arecommend_batch(
+        self, user_queries: List[str], concurrency: int
+    ) -> Dict[str, Union[List[Document], Exception]]:
+        """
+        Recommend for several queries at once, identical queries run once.
+        Rewrites go out as one LLM batch and all rewritten queries are embedded
+        with a single `embed_documents` call, then retrieval, reranking and balancing
+        run for at most `concurrency` queries at a time.
+        A failing query maps to its exception, the other queries are unaffected.
+        """
+        queries = list(dict.fromkeys(user_queries))
+        with stage_span("rewrite", upstream="llm"):
+            transformed_queries = await self.query_transformer.abatch_rewrite_and_infer(queries, concurrency)
+        results: Dict[str, Union[List[Document], Exception]] = {
+            query: transformed_query
+            for query, transformed_query in zip(queries, transformed_queries)
+            if isinstance(transformed_query, Exception)
+        }
+        if results:
+            # Failed rewrites come back as values, so the span above did not count them
+            UPSTREAM_ERRORS.inc(len(results), upstream="llm")
+        pending = [
+            (query, transformed_query)
+            for query, transformed_query in zip(queries, transformed_queries)
+            if not isinstance(transformed_query, Exception)
+        ]
+        
+        vectors: List[List[float]] = []
+        embeddings = get_query_embeddings(self.retriever)
+        if embeddings is not None and pending:
+            try:
+                vectors = await embeddings.aembed_documents(
+                    [transformed_query.rewritten_query for _, transformed_query in pending]
+                )
+            except Exception as e:
+                # Every query can still be embedded by its own retrieval call
+                logger.warning("batch query embedding failed, embedding queries one by one", extra={"fields": {"error": e}})
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def recommend_one(idx: int) -> List[Document]:
+            _, transformed_query = pending[idx]
+            async with semaphore:
+                with stage_span("retrieve", upstream="vector_store"):
+                    retrieved_tests = await self._aretrieve(transformed_query, vectors[idx] if vectors else None)
+                    candidate_tests = self._select_candidates(retrieved_tests)
+                with stage_span("rerank", upstream="reranker"):
+                    reranked_tests = await self.reranker.arerank(
+                        transformed_query.rewritten_query,
+                        candidate_tests
+                    )
+            with stage_span("balance"):
+                return self.balancer.balance_selection(
+                    reranked_tests,
+                    transformed_query.preferred_intent
+                )
+        
+        outcomes = await asyncio.gather(
+            *(recommend_one(idx) for idx in range(len(pending))), return_exceptions=True
+        )
+        for (query, _), outcome in zip(pending, outcomes):
+            if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+                raise outcome
+            results[query] = outcome
+        logger.info("batch recommendation completed", extra={"fields": {
+            "queries": len(queries),
+            "failed": sum(isinstance(result, Exception) for result in results.values())
+        }})
+        return results
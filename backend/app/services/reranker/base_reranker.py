@@ -1,3 +1,4 @@
+import asyncio
 from langchain_core.documents import Document, BaseDocumentCompressor
 
 from abc import ABC, abstractmethod
@@ -9,6 +10,10 @@ class BaseReranker(ABC):
     def rerank(self, query: str, documents: list) -> List[Tuple[Document, float]]:
         pass
     
+    async def arerank(self, query: str, documents: list) -> List[Tuple[Document, float]]:
+        """Async rerank, providers with an async client should override this."""
+        return await asyncio.to_thread(self.rerank, query, documents)
+    
     @abstractmethod
     def get_compressor(self) -> BaseDocumentCompressor:
         pass
@@ -0,0 +1,47 @@
+from typing import Callable, List, Tuple
+from langchain_core.documents import Document
+
+from app.services.reranker.base_reranker import BaseReranker
+from app.services.sparse.bm25_index import BM25Index
+from app.services.sparse.catalogue_corpus import get_catalogue_index
+from app.utils.envs import Envs
+
+
+class BM25Reranker(BaseReranker):
+    """
+    Lexical reranker that scores candidates with BM25 against an inverted index
+    precomputed over the catalogue, entirely in-process.
+    Scores are normalized to [0, 1] by the best candidate.
+    The index is fetched from `get_index` on every call, so a rebuilt index is picked up.
+    """
+
+    def __init__(self, get_index: Callable[[], BM25Index], top_n: int):
+        self.get_index = get_index
+        self.top_n = top_n
+
+    def rerank(self, query: str, documents: List[Document]) -> List[Tuple[Document, float]]:
+        if not documents:
+            return []
+
+        # Without corpus statistics, rank the candidates against each other
+        index = self.get_index()
+        if not len(index):
+            index = BM25Index(documents)
+        scores = index.score(query, documents)
+        top_score = max(scores)
+        if top_score <= 0:
+            # No lexical overlap at all, keep the retrieval order
+            return [(doc, 1.0 / (idx + 1)) for idx, doc in enumerate(documents)][:self.top_n]
+
+        ranked_documents = [(doc, score / top_score) for doc, score in zip(documents, scores)]
+        return sorted(ranked_documents, key=lambda x: x[1], reverse=True)[:self.top_n]
+
+    async def arerank(self, query: str, documents: List[Document]) -> List[Tuple[Document, float]]:
+        # Scoring takes well under a millisecond, a thread hop would cost more
+        return self.rerank(query, documents)
+
+    def get_compressor(self):  # type: ignore
+        return None
+
+
+bm25_reranker = BM25Reranker(get_index=get_catalogue_index, top_n=Envs.RERANKER_TOP_N)
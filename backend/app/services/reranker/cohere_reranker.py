@@ -1,5 +1,5 @@
 import os
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
 from langchain_core.documents import Document
 from langchain_cohere import CohereRerank
 
@@ -15,8 +15,7 @@ class CohereReranker(BaseReranker):
     def __init__(self, model: str = "rerank-v4.0-pro"):
         self.reranker = CohereRerank(model=model, top_n=Envs.RERANKER_TOP_N)
 
-    def rerank(self, query: str, documents: List[Document]) -> List[Tuple[Document, float]]:
-        reranked_docs = self.reranker.compress_documents(documents, query)
+    def _to_ranked(self, reranked_docs: Sequence[Document]) -> List[Tuple[Document, float]]:
         ranked_documents: List[Tuple[Document, float]] = []
         
         for doc in reranked_docs:
@@ -24,6 +23,12 @@ class CohereReranker(BaseReranker):
             ranked_documents.append((doc, float(score)))
         
         return sorted(ranked_documents, key=lambda x: x[1], reverse=True)
+
+    def rerank(self, query: str, documents: List[Document]) -> List[Tuple[Document, float]]:
+        return self._to_ranked(self.reranker.compress_documents(documents, query))
+
+    async def arerank(self, query: str, documents: List[Document]) -> List[Tuple[Document, float]]:
+        return self._to_ranked(await self.reranker.acompress_documents(documents, query))
     
     def get_compressor(self) -> BaseDocumentCompressor:
         return self.reranker
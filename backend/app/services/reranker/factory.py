@@ -1,15 +1,15 @@
 from app.services.reranker.base_reranker import BaseReranker
-from app.services.reranker.llm_reranker import llm_reranker
-from app.services.reranker.pinecone_reranker import pinecone_reranker
-from app.services.reranker.cohere_reranker import cohere_reranker
 from app.utils.envs import Envs
+from app.utils.registry import LazyRegistry
 
 
-_PROVIDER_MAP = {
-    "llm": llm_reranker,
-    "pinecone": pinecone_reranker,
-    "cohere": cohere_reranker,
-}
+# Only the configured reranker is imported and built, on first use
+_PROVIDER_MAP = LazyRegistry({
+    "llm": "app.services.reranker.llm_reranker:llm_reranker",
+    "pinecone": "app.services.reranker.pinecone_reranker:pinecone_reranker",
+    "cohere": "app.services.reranker.cohere_reranker:cohere_reranker",
+    "bm25": "app.services.reranker.bm25_reranker:bm25_reranker",
+})
 
 def get_reranker() -> BaseReranker:
     provider = (getattr(Envs, "RERANKER_PROVIDER", None) or "pinecone").lower()
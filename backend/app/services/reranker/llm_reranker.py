@@ -1,33 +1,227 @@
-from typing import List
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from langchain_core.language_models import BaseChatModel
 from langchain_core.documents import Document
+from langchain_core.runnables import Runnable
 
-from app.services.llm.factory import get_llm
+from app.pydantic_models.data_model import ListwiseScores
+from app.services.llm.factory import get_chat_model
 from app.services.reranker.base_reranker import BaseReranker
+from app.utils.envs import Envs
+from app.utils.logger import get_logger
+from app.utils.metrics import UPSTREAM_ERRORS
+
+
+logger = get_logger(__name__)
+
+
+_NUMBER_PATTERN = re.compile(r"(\d+(?:\.\d+)?|\.\d+)\s*(%|/\s*(?:10|100))?")
+
+# The model to call, its prompt and the parser turning its response into {document index: score}
+_ScoringCall = Tuple[Runnable, str, Callable[[Any], Dict[int, float]]]
 
 
 class LLMReranker(BaseReranker):
-    def __init__(self, llm: BaseChatModel):
+    """
+    Scores documents against the query with an LLM, in one of two modes:
+    - listwise: documents are scored in batches, one structured-output call scores a whole batch
+    - pointwise: one call per document
+    Calls run concurrently, bounded per request, under a per-request deadline.
+    Documents that are not scored before the deadline get a score of 0.
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        mode: str = "listwise",
+        batch_size: int = 10,
+        concurrency: int = 8,
+        timeout: float = 10.0,
+        max_chars: int = 800
+    ):
+        if mode not in ("listwise", "pointwise"):
+            raise ValueError(f"Unsupported LLM reranker mode: {mode}")
         self.llm = llm
+        self.mode = mode
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self.listwise_llm = llm.with_structured_output(ListwiseScores) if llm is not None else None
         self.prompt_template = """
             Query: {query}
             Document: {page_content}
             Score relevance from 0 to 1.
             Only output the numeric score.
             """
+        self.listwise_prompt_template = """
+            Query: {query}
+            Documents:
+            {documents}
+            Score the relevance of every document to the query from 0 to 1.
+            Return one score per document, identified by its document number.
+            """
+
+    def parse_score(self, text: str) -> Optional[float]:
+        """
+        Extract a relevance score in [0, 1] from free-form LLM output.
+        Accepts plain numbers, percentages and x/10 or x/100 ratings.
+        """
+        match = _NUMBER_PATTERN.search(text or "")
+        if match is None:
+            return None
+
+        score = float(match.group(1))
+        scale = (match.group(2) or "").replace(" ", "")
+        if scale == "%" or scale == "/100":
+            score /= 100
+        elif scale == "/10":
+            score /= 10
+        elif score > 10:
+            score /= 100
+        elif score > 1:
+            score /= 10
+        return min(max(score, 0.0), 1.0)
+
+    def listwise_scores(self, output: Optional[ListwiseScores], batch_len: int) -> Dict[int, float]:
+        """
+        Map the 1-based document numbers of a listwise response to batch positions,
+        clamping scores to [0, 1] and ignoring out of range numbers, e.g.
+
+        >>> from app.pydantic_models.data_model import DocumentScore
+        >>> reranker = LLMReranker(llm=None)
+        >>> reranker.listwise_scores(ListwiseScores(scores=[
+        ...     DocumentScore(index=1, score=0.8), DocumentScore(index=3, score=1.5), DocumentScore(index=4, score=0.2)
+        ... ]), 3)
+        {0: 0.8, 2: 1.0}
+        """
+        if output is None:
+            return {}
+        return {
+            item.index - 1: min(max(item.score, 0.0), 1.0)
+            for item in output.scores
+            if 0 < item.index <= batch_len
+        }
+
+    def _truncate(self, text: str) -> str:
+        return text if len(text) <= self.max_chars else text[:self.max_chars] + "..."
 
-    def rerank(self, query: str, documents: List[Document]) -> list:
-        ranked_documents: list[tuple[Document, float]] = []
-        for doc in documents:
-            prompt = self.prompt_template.format(query=query, page_content=doc.page_content)
-            score = self.llm.invoke(prompt).content
-            ranked_documents.append((doc, float(score)))  # type: ignore
-        
+    def _scoring_calls(self, query: str, documents: List[Document]) -> List[_ScoringCall]:
+        """One LLM call per batch (listwise) or per document (pointwise), with the parser of its response."""
+        if self.mode == "pointwise":
+            def parse_document(idx: int) -> Callable[[Any], Dict[int, float]]:
+                def parse(response: Any) -> Dict[int, float]:
+                    score = self.parse_score(str(response.content))
+                    return {} if score is None else {idx: score}
+                return parse
+
+            return [
+                (
+                    self.llm,
+                    self.prompt_template.format(query=query, page_content=self._truncate(doc.page_content)),
+                    parse_document(idx)
+                )
+                for idx, doc in enumerate(documents)
+            ]
+
+        def parse_batch(start: int, batch_len: int) -> Callable[[Any], Dict[int, float]]:
+            return lambda output: {
+                start + position: score for position, score in self.listwise_scores(output, batch_len).items()
+            }
+
+        calls: List[_ScoringCall] = []
+        for start in range(0, len(documents), self.batch_size):
+            batch = documents[start:start + self.batch_size]
+            numbered = "\n".join(
+                f"[{position}] {self._truncate(doc.page_content)}"
+                for position, doc in enumerate(batch, start=1)
+            )
+            calls.append((
+                self.listwise_llm,
+                self.listwise_prompt_template.format(query=query, documents=numbered),
+                parse_batch(start, len(batch))
+            ))
+        return calls
+
+    def _score(self, call: _ScoringCall, scores: Dict[int, float]) -> None:
+        model, prompt, parse = call
+        scores.update(parse(model.invoke(prompt)))
+
+    async def _ascore(self, call: _ScoringCall, semaphore: asyncio.Semaphore, scores: Dict[int, float]) -> None:
+        model, prompt, parse = call
+        async with semaphore:
+            response = await model.ainvoke(prompt)
+        scores.update(parse(response))
+
+    def _ranked(
+        self, documents: List[Document], scores: Dict[int, float], timed_out: int, failed: int
+    ) -> List[Tuple[Document, float]]:
+        if timed_out or failed:
+            UPSTREAM_ERRORS.inc(timed_out + failed, upstream="llm_reranker")
+            logger.warning("LLM reranker calls did not complete", extra={"fields": {
+                "scored": len(scores), "documents": len(documents), "timed_out": timed_out, "failed": failed
+            }})
+
+        if not scores:
+            # Nothing usable came back, keep the retrieval order
+            logger.warning("LLM reranker returned no usable scores, keeping the retrieval order", extra={"fields": {
+                "scored": len(scores), "documents": len(documents)
+            }})
+            return [(doc, 1.0 / (idx + 1)) for idx, doc in enumerate(documents)]
+
+        ranked_documents = [(doc, scores.get(idx, 0.0)) for idx, doc in enumerate(documents)]
         return sorted(ranked_documents, key=lambda x: x[1], reverse=True)
-    
+
+    async def arerank(self, query: str, documents: List[Document]) -> List[Tuple[Document, float]]:
+        if not documents:
+            return []
+
+        # Tasks write into a shared dict, so scores finished before the deadline are kept
+        scores: Dict[int, float] = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.create_task(self._ascore(call, semaphore, scores))
+            for call in self._scoring_calls(query, documents)
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=self.timeout)
+        for task in pending:
+            task.cancel()
+        failed = sum(1 for task in done if task.exception() is not None)
+        return self._ranked(documents, scores, len(pending), failed)
+
+    def rerank(self, query: str, documents: List[Document]) -> List[Tuple[Document, float]]:
+        """
+        Sync variant of `arerank` on the sync LLM client, with calls spread over a thread pool.
+        Running `arerank` under `asyncio.run` would bind the chat model's async HTTP client
+        to a loop that is closed right after, breaking the next call.
+        The pool belongs to this call, so its calls never queue behind other requests' calls.
+        """
+        if not documents:
+            return []
+
+        scores: Dict[int, float] = {}
+        calls = self._scoring_calls(query, documents)
+        executor = ThreadPoolExecutor(max_workers=min(self.concurrency, len(calls)), thread_name_prefix="llm-reranker")
+        try:
+            futures = [executor.submit(self._score, call, scores) for call in calls]
+            done, pending = wait(futures, timeout=self.timeout)
+        finally:
+            # Do not block on calls still running past the deadline
+            executor.shutdown(wait=False, cancel_futures=True)
+        failed = sum(1 for future in done if future.exception() is not None)
+        # Calls still running past the deadline may write later, rank on what is there now
+        return self._ranked(documents, dict(scores), len(pending), failed)
+
     def get_compressor(self):  # type: ignore
         return None
 
 
-llm_reranker = LLMReranker(llm=get_llm())
-    
\ No newline at end of file
+llm_reranker = LLMReranker(
+    llm=get_chat_model(),
+    mode=Envs.LLM_RERANKER_MODE,
+    batch_size=Envs.LLM_RERANKER_BATCH_SIZE,
+    concurrency=Envs.LLM_RERANKER_CONCURRENCY,
+    timeout=Envs.LLM_RERANKER_TIMEOUT
+)
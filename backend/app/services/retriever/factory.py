@@ -1,14 +1,15 @@
 from langchain_core.retrievers import BaseRetriever
 
-from app.services.retriever.mmr_retriever import mmr_retriever
-from app.services.retriever.vanila_retriever import vanila_retriever
 from app.utils.envs import Envs
+from app.utils.registry import LazyRegistry
 
 
-_RETRIEVER_MAP = {
-    "vanila": vanila_retriever,
-    "mmr": mmr_retriever
-}
+# Only the configured retriever (and the vector store it wraps) is imported and built, on first use
+_RETRIEVER_MAP = LazyRegistry({
+    "vanila": "app.services.retriever.vanila_retriever:vanila_retriever",
+    "mmr": "app.services.retriever.mmr_retriever:mmr_retriever",
+    "hybrid": "app.services.retriever.hybrid_retriever:hybrid_retriever"
+})
 
 def get_retriever() -> BaseRetriever:
     provider = (getattr(Envs, "RETRIEVER_PROVIDER", "mmr")).lower()
@@ -0,0 +1,108 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from app.services.retriever.metadata_filter import matches_filter
+from app.services.retriever.mmr_retriever import mmr_retriever
+from app.services.retriever.vector_search import with_retrieval_score
+from app.services.sparse.bm25_index import BM25Index, document_key
+from app.services.sparse.catalogue_corpus import get_catalogue_index
+from app.utils.envs import Envs
+
+
+# Sparse search is CPU-bound and short, one shared worker is enough to overlap it with the dense call
+_sparse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sparse-retrieval")
+
+
+def _fusion_key(doc: Document) -> str:
+    # Chunks of the same assessment share a url, so they count as one result
+    return doc.metadata.get("url") or document_key(doc)
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int, rrf_k: int = 60) -> List[Document]:
+    """
+    Fuse ranked lists with RRF, score(d) = sum over lists of 1 / (rrf_k + rank of d).
+    Only ranks are used, so dense similarities and BM25 scores need no calibration.
+    The fused documents carry their score as the retrieval score, divided by the score
+    of a document ranked first in every list so it reads in [0, 1].
+    """
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for ranking in rankings:
+        seen = set()
+        for rank, doc in enumerate(ranking, start=1):
+            key = _fusion_key(doc)
+            if key in seen:
+                continue
+            seen.add(key)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+    best_score = len(rankings) / (rrf_k + 1)
+    return [with_retrieval_score(documents[key], score / best_score) for key, score in fused]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Runs a dense retriever and a local BM25 index in parallel and fuses both
+    rankings with reciprocal rank fusion. The sparse side catches exact skill
+    names ("Java 8", ".NET", "SQL Server") that embeddings tend to blur.
+
+    Search kwargs given to `invoke` go to the dense retriever; a metadata `filter`
+    also applies to the BM25 results and `k` overrides the fused result count.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    dense_retriever: BaseRetriever
+    # Called per query, so the sparse side follows catalogue re-ingests
+    get_sparse_index: Callable[[], BM25Index]
+    k: int
+    sparse_k: int
+    rrf_k: int = 60
+
+    def _sparse_search(self, query: str, metadata_filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return [
+            doc for doc, _ in self.get_sparse_index().search(query, self.sparse_k)
+            if matches_filter(doc.metadata, metadata_filter)
+        ]
+
+    def _fuse(self, dense_docs: List[Document], sparse_docs: List[Document], k: Optional[int] = None) -> List[Document]:
+        return reciprocal_rank_fusion([dense_docs, sparse_docs], k=k or self.k, rrf_k=self.rrf_k)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> List[Document]:
+        sparse_future = _sparse_executor.submit(self._sparse_search, query, kwargs.get("filter"))
+        dense_docs = self.dense_retriever.invoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        return self._fuse(dense_docs, sparse_future.result(), kwargs.get("k"))
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun, **kwargs: Any
+    ) -> List[Document]:
+        return await self.afuse_dense(
+            query, self.dense_retriever.ainvoke(query, config={"callbacks": run_manager.get_child()}, **kwargs), **kwargs
+        )
+
+    async def afuse_dense(self, query: str, dense_search: Awaitable[List[Document]], **kwargs: Any) -> List[Document]:
+        """Run the BM25 search alongside the given dense search (run with the same search kwargs) and fuse both rankings."""
+        dense_docs, sparse_docs = await asyncio.gather(
+            dense_search,
+            asyncio.get_running_loop().run_in_executor(_sparse_executor, self._sparse_search, query, kwargs.get("filter"))
+        )
+        return self._fuse(dense_docs, sparse_docs, kwargs.get("k"))
+
+
+hybrid_retriever = HybridRetriever(
+    dense_retriever=mmr_retriever,
+    get_sparse_index=get_catalogue_index,
+    k=Envs.TOP_K,
+    sparse_k=Envs.HYBRID_SPARSE_K,
+    rrf_k=Envs.HYBRID_RRF_K
+)
@@ -0,0 +1,100 @@
+from typing import Any, Dict, List, Optional
+
+from app.pydantic_models.data_model import PreferredIntent
+
+
+# Same buckets as the balancer's duration bonus, in minutes
+DURATION_BUCKETS = {
+    "short": {"$lte": 30},
+    "medium": {"$gt": 30, "$lte": 60},
+    "long": {"$gt": 60}
+}
+
+FILTER_MODES = ("off", "soft", "hard")
+
+
+def _duration_filter(bucket: str) -> Dict[str, Any]:
+    bounds = [{"duration": {operator: value}} for operator, value in DURATION_BUCKETS[bucket].items()]
+    in_bucket = bounds[0] if len(bounds) == 1 else {"$and": bounds}
+    if bucket == "short":
+        # Unknown durations are stored as 0, which the short bucket already covers
+        return in_bucket
+    return {"$or": [{"duration": {"$eq": 0}}, in_bucket]}
+
+
+def build_metadata_filter(
+    intent: PreferredIntent,
+    remote_support: Optional[bool] = None,
+    adaptive_support: Optional[bool] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Vector store metadata filter for the inferred intent, in Pinecone's filter language
+    (which the local vector store evaluates too), None when the intent restricts nothing.
+    - preferred test types: the assessment has at least one of the codes
+    - duration preference: the duration is in the bucket or unknown
+    - remote / adaptive support: the flag has the given value
+    """
+    clauses: List[Dict[str, Any]] = []
+    if intent.preferred_test_types:
+        clauses.append({"test_type": {"$in": sorted(set(intent.preferred_test_types))}})
+    if intent.duration_preference in DURATION_BUCKETS:
+        clauses.append(_duration_filter(intent.duration_preference))  # type: ignore
+    if remote_support is not None:
+        clauses.append({"remote_support": {"$eq": remote_support}})
+    if adaptive_support is not None:
+        clauses.append({"adaptive_support": {"$eq": adaptive_support}})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    # A list field (test_type) matches when any of its elements does, as in Pinecone
+    if isinstance(value, list):
+        if operator == "$ne":
+            return operand not in value
+        if operator == "$nin":
+            return not any(item in operand for item in value)
+        return any(_compare(item, operator, operand) for item in value)
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if value is None:
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    if operator == "$lte":
+        return value <= operand
+    raise ValueError(f"Unsupported metadata filter operator: {operator}")
+
+
+def matches_filter(metadata: Dict[str, Any], metadata_filter: Optional[Dict[str, Any]]) -> bool:
+    """Whether document metadata satisfies a Pinecone-style filter ($eq, $ne, $in, $nin, $gt(e), $lt(e), $and, $or)."""
+    if not metadata_filter:
+        return True
+    for key, condition in metadata_filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if key not in metadata:
+                return False
+            if not all(_compare(metadata[key], operator, operand) for operator, operand in condition.items()):
+                return False
+        elif key not in metadata or not _compare(metadata[key], "$eq", condition):
+            # A bare value is shorthand for $eq
+            return False
+    return True
@@ -0,0 +1,84 @@
+from typing import Any, Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStoreRetriever
+
+
+# Metadata key of the score a retrieved document was ranked by: the similarity score of vector
+# stores that report it with their results, or the fused score of the hybrid retriever
+RETRIEVAL_SCORE_KEY = "retrieval_score"
+
+
+def _vector_store_retriever(retriever: BaseRetriever) -> Optional[VectorStoreRetriever]:
+    """The vector store retriever doing the dense search, directly or inside a hybrid retriever."""
+    if isinstance(retriever, VectorStoreRetriever):
+        return retriever
+    dense_retriever = getattr(retriever, "dense_retriever", None)
+    return dense_retriever if isinstance(dense_retriever, VectorStoreRetriever) else None
+
+
+def get_query_embeddings(retriever: BaseRetriever) -> Optional[Embeddings]:
+    """Embedder the retriever embeds queries with, None when it does not search by vector."""
+    dense_retriever = _vector_store_retriever(retriever)
+    return dense_retriever.vectorstore.embeddings if dense_retriever is not None else None
+
+
+def filtered_search_kwargs(
+    retriever: BaseRetriever, metadata_filter: Dict[str, Any], k: int, fetch_k: int
+) -> Dict[str, Any]:
+    """
+    Search kwargs restricting the retriever's dense search to `metadata_filter` with a smaller
+    candidate budget, passed as `retriever.invoke(query, **search_kwargs)`. The filter goes to
+    the vector store (Pinecone's `filter` or the local store's equivalent), so it is applied
+    before the top-k and MMR candidate pool are cut, not after.
+    """
+    search_kwargs: Dict[str, Any] = {"filter": metadata_filter, "k": k}
+    dense_retriever = _vector_store_retriever(retriever)
+    if dense_retriever is not None and dense_retriever.search_type == "mmr":
+        search_kwargs["fetch_k"] = max(fetch_k, k)
+    return search_kwargs
+
+
+async def _adense_search(
+    retriever: VectorStoreRetriever, query: str, embedding: List[float], **kwargs: Any
+) -> List[Document]:
+    search_kwargs = dict(retriever.search_kwargs, **kwargs)
+    if retriever.search_type == "mmr":
+        return await retriever.vectorstore.amax_marginal_relevance_search_by_vector(embedding, **search_kwargs)
+    if retriever.search_type == "similarity":
+        return await retriever.vectorstore.asimilarity_search_by_vector(embedding, **search_kwargs)
+    # Score thresholds are applied on relevance scores, which only the query search path computes
+    return await retriever.ainvoke(query, **kwargs)
+
+
+async def aretrieve_by_vector(
+    retriever: BaseRetriever, query: str, embedding: List[float], **search_kwargs: Any
+) -> List[Document]:
+    """
+    Same documents as `retriever.ainvoke(query, **search_kwargs)`, searching with a precomputed
+    query embedding, so a batch of queries can be embedded in a single call. Retrievers that
+    do not search by vector fall back to `ainvoke`.
+    """
+    if isinstance(retriever, VectorStoreRetriever):
+        return await _adense_search(retriever, query, embedding, **search_kwargs)
+
+    dense_retriever = _vector_store_retriever(retriever)
+    if dense_retriever is not None:
+        return await retriever.afuse_dense(  # type: ignore
+            query, _adense_search(dense_retriever, query, embedding, **search_kwargs), **search_kwargs
+        )
+
+    return await retriever.ainvoke(query, **search_kwargs)
+
+
+def retrieval_scores(docs: List[Document]) -> Optional[List[float]]:
+    """Retrieval scores attached to the documents, None unless every document has one."""
+    scores = [doc.metadata.get(RETRIEVAL_SCORE_KEY) for doc in docs]
+    return None if any(score is None for score in scores) else scores  # type: ignore
+
+
+def with_retrieval_score(doc: Document, score: float) -> Document:
+    """Copy of the document carrying `score`, documents may be shared (e.g. by the BM25 index)."""
+    return Document(id=doc.id, page_content=doc.page_content, metadata={**doc.metadata, RETRIEVAL_SCORE_KEY: score})
@@ -1,11 +1,15 @@
 import re
 from typing import List, Optional
-from bs4 import BeautifulSoup
 from langchain_core.documents import Document
 import tqdm
 
 from app.pydantic_models.data_model import IndividualTest
 from app.services.scraper.base_scraper import BaseScraper
+from app.services.scraper.html_parser import container_strainer
+from app.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
 
 TEST_TYPE_MAP = {
     "A": "Ability & Aptitude",
@@ -44,37 +48,52 @@ class AssessmentScraper(BaseScraper):
         container_class_selector: str = "col-12 col-md-8",
         container_row_selector: str = "product-catalogue-training-calendar__row typ",
     ):
-        for test in tqdm.tqdm(tests, unit=("assessments")):
-            soup = BeautifulSoup(self.crawl(test.url), "html.parser")
-            
-            container = soup.find("div", {"class": container_class_selector}).find_all(  # type: ignore
-                "div", attrs={"class": container_row_selector}
-            )  # type: ignore
+        pages = self.iter_crawl([test.url for test in tests])
+        for test, page in tqdm.tqdm(zip(tests, pages), total=len(tests), unit=("assessments")):
+            self.parse_assessment_details(test, page, container_class_selector, container_row_selector)
 
-            description = self.sanitize_text(container[0].p.text)  # type: ignore
-            
-            # Additional details for relevant recommendation
-            job_levels = None
-            if len(container) > 2:
-                job_levels = self.sanitize_text(container[1].p.text)  # type: ignore
-                
-            languages = None
-            if len(container) > 3:
-                languages = self.sanitize_text(container[2].p.text)  # type: ignore
-            
-            duration = 0
-            if container[-1].p:
-                duration_text = container[-1].p.text  # type: ignore
-                digits = sorted(list(filter(str.isdigit, duration_text.split())))
-                extracted_duration = digits[-1] if digits else "0"
-                if extracted_duration.isdigit():
-                    duration = int(extracted_duration)
-                else:
-                    duration = 0
+    def extract_assessment_detail(self, test: IndividualTest) -> IndividualTest:
+        """Crawl and parse the detail page of a single assessment, used by the ingestion pipeline workers."""
+        self.parse_assessment_details(test, self.crawl(test.url))
+        return test
+
+    def parse_assessment_details(
+        self,
+        test: IndividualTest,
+        page: str,
+        container_class_selector: str = "col-12 col-md-8",
+        container_row_selector: str = "product-catalogue-training-calendar__row typ",
+    ):
+        soup = self.parse(page, container_strainer(container_class_selector))
+        
+        container = soup.find("div", {"class": container_class_selector}).find_all(  # type: ignore
+            "div", attrs={"class": container_row_selector}
+        )  # type: ignore
+
+        description = self.sanitize_text(container[0].p.text)  # type: ignore
+        
+        # Additional details for relevant recommendation
+        job_levels = None
+        if len(container) > 2:
+            job_levels = self.sanitize_text(container[1].p.text)  # type: ignore
             
-            test.description = description  # type: ignore
-            test.duration = duration
-            test.page_content = f"""
+        languages = None
+        if len(container) > 3:
+            languages = self.sanitize_text(container[2].p.text)  # type: ignore
+        
+        duration = 0
+        if container[-1].p:
+            duration_text = container[-1].p.text  # type: ignore
+            digits = sorted(list(filter(str.isdigit, duration_text.split())))
+            extracted_duration = digits[-1] if digits else "0"
+            if extracted_duration.isdigit():
+                duration = int(extracted_duration)
+            else:
+                duration = 0
+        
+        test.description = description  # type: ignore
+        test.duration = duration
+        test.page_content = f"""
 Test name: {test.name}
 About Test: {description}
 {self.handle_job_levels(job_levels)}
@@ -83,7 +102,9 @@ About Test: {description}
 {self.handle_remote_testing(test.remote_support)}
 Test category: {self.handle_test_types(test.test_type)}.
 """
-            print(f"Test {test.name}, desc: {description}, duration: {duration}, job_levels: {job_levels}, languages: {languages}\n")
+        logger.debug("assessment parsed", extra={"fields": {
+            "name": test.name, "duration": duration, "job_levels": job_levels, "languages": languages
+        }})
 
     def handle_job_levels(self, job_levels: Optional[str]) -> str:
         if job_levels is None:
@@ -1,11 +1,69 @@
-import random
-import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
 import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from app.services.scraper.html_parser import parse_html, resolve_parser
+from app.services.scraper.http_cache import HttpCache, OfflineCacheMiss
 from app.utils.envs import Envs
+from app.utils.rate_limiter import HostRateLimiter
+
+
+def create_session(pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+    """
+    Session with a keep-alive connection pool sized for `pool_size` concurrent requests,
+    retrying connection errors, 429 and 5xx responses with exponential backoff
+    (honouring Retry-After).
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_rate_limiter = HostRateLimiter(rate=Envs.SCRAPER_RATE_LIMIT, burst=Envs.SCRAPER_BURST)
+_shared_http_cache = HttpCache(Envs.SCRAPER_CACHE_DIR) if Envs.SCRAPER_CACHE_ENABLED or Envs.SCRAPER_OFFLINE else None
+
+
+def get_shared_session() -> requests.Session:
+    """
+    Session shared by every scraper in the process, so connections are reused across pages.
+    The pool fits every fetching thread of the ingest pipeline (crawl and parse stages run at
+    the same time), or of a standalone `crawl_many`, so none waits on or discards a connection.
+    """
+    global _shared_session
+    if _shared_session is None:
+        _shared_session = create_session(
+            pool_size=max(Envs.SCRAPER_WORKERS, Envs.INGEST_CRAWL_WORKERS + Envs.INGEST_PARSE_WORKERS),
+            max_retries=Envs.SCRAPER_MAX_RETRIES,
+            backoff_factor=Envs.SCRAPER_BACKOFF
+        )
+    return _shared_session
 
 
 class BaseScraper:
+    """
+    Fetches pages through a shared, pooled session, rate limited per host.
+    `crawl_many` fetches several pages concurrently with `workers` threads.
+    With an HTTP cache, cached pages are revalidated with conditional GETs and
+    unchanged pages are served from disk. In offline mode pages are only replayed
+    from the cache and nothing is requested.
+    The session, rate limiter and cache can be injected, e.g. to crawl a local fixture server.
+    Pages are parsed with the `parser` backend (lxml when available), and with `parse_only`
+    subclasses build only the part of the page they extract from.
+    """
     
     DEFAULT_HEADERS = {
         "User-Agent": Envs.SCRAPER_USER_AGENT,
@@ -15,19 +73,82 @@ class BaseScraper:
         "Connection": "keep-alive"
     }
 
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        workers: int = Envs.SCRAPER_WORKERS,
+        timeout: float = Envs.SCRAPER_TIMEOUT,
+        http_cache: Optional[HttpCache] = _shared_http_cache,
+        offline: bool = Envs.SCRAPER_OFFLINE,
+        parser: str = Envs.HTML_PARSER,
+        parse_only: bool = Envs.HTML_PARSE_ONLY
+    ):
+        if offline and http_cache is None:
+            raise ValueError("Offline scraping needs an HTTP cache to replay from")
+        self.session = session or get_shared_session()
+        self.rate_limiter = rate_limiter or _shared_rate_limiter
+        self.workers = workers
+        self.timeout = timeout
+        self.http_cache = http_cache
+        self.offline = offline
+        self.parser = resolve_parser(parser)
+        self.parse_only = parse_only
+
+    def parse(self, page: str, strainer: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Parse a page, restricted to the elements `strainer` matches when `parse_only` is on."""
+        return parse_html(page, self.parser, strainer if self.parse_only else None)
+
     def crawl(self, url: str, delay: bool = True) -> str:
         """
         Crawl a URL with browser-like headers to avoid getting blocked.
         
         Args:
             url: The URL to crawl
-            delay: Whether to add a random delay before the request (default: True)
+            delay: Whether to wait for the host's rate limit before the request (default: True)
         """
+        entry = self.http_cache.get(url) if self.http_cache is not None else None
+        if self.offline:
+            if entry is None:
+                raise OfflineCacheMiss(f"{url} is not in the HTTP cache")
+            return self.http_cache.hit(entry, revalidated=False)  # type: ignore
+        
         if delay:
-            time.sleep(random.uniform(0.5, 0.9))
+            self.rate_limiter.acquire(url)
         
-        session = requests.Session()
-        response = session.get(url, headers=self.DEFAULT_HEADERS, timeout=30)
+        headers = {**self.DEFAULT_HEADERS}
+        if self.http_cache is not None:
+            headers.update(self.http_cache.conditional_headers(entry))
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and entry is not None:
+            return self.http_cache.hit(entry, revalidated=True)  # type: ignore
         response.raise_for_status()
         
+        if self.http_cache is not None:
+            self.http_cache.put(
+                url, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified")
+            )
         return response.text
+
+    def iter_crawl(self, urls: List[str], delay: bool = True) -> Iterator[str]:
+        """
+        Crawl URLs concurrently and yield their pages in input order, as soon as each is available.
+        The first failed request raises once its page is reached.
+        """
+        if len(urls) <= 1 or self.workers <= 1:
+            for url in urls:
+                yield self.crawl(url, delay)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crawler") as executor:
+            futures = [executor.submit(self.crawl, url, delay) for url in urls]
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def crawl_many(self, urls: List[str], delay: bool = True) -> List[str]:
+        """Crawl URLs concurrently, pages are returned in input order."""
+        return list(self.iter_crawl(urls, delay))
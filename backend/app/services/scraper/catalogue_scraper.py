@@ -1,8 +1,8 @@
 from typing import List
-from bs4 import BeautifulSoup
 from langchain_core.documents import Document
 from app.pydantic_models.data_model import IndividualTest
 from app.services.scraper.base_scraper import BaseScraper
+from app.services.scraper.html_parser import table_rows_strainer
 from app.utils.envs import Envs
 
 
@@ -12,7 +12,10 @@ class CatalogueScraper(BaseScraper):
     """
     
     def extract_individual_tests(self, url: str) -> List[IndividualTest]:
-        soup = BeautifulSoup(self.crawl(url), "html.parser")
+        return self.parse_individual_tests(self.crawl(url), url)
+    
+    def parse_individual_tests(self, page: str, url: str) -> List[IndividualTest]:
+        soup = self.parse(page, table_rows_strainer())
         # Page contains two tables, Pre-packaged Job Solutions and Individual Test
         # we want to extract links from the Individual Test table only
         # Skip the first 14 rows which are headers and assessment rows of 
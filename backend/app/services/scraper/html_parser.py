@@ -0,0 +1,46 @@
+from importlib.util import find_spec
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from app.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+_PARSERS = ("lxml", "html.parser")
+
+
+def lxml_available() -> bool:
+    return find_spec("lxml") is not None
+
+
+def resolve_parser(name: str) -> str:
+    """
+    BeautifulSoup tree builder for a configured parser name. `auto` picks lxml (C, several times
+    faster), a declared dependency, and the pure-Python `html.parser` when an environment lacks it;
+    an explicit `lxml` falls back the same way.
+    """
+    name = (name or "auto").lower()
+    if name not in _PARSERS and name != "auto":
+        raise ValueError(f"Unsupported HTML parser: {name}")
+    if name == "html.parser":
+        return name
+    if lxml_available():
+        return "lxml"
+    logger.warning("lxml is not installed, falling back to html.parser", extra={"fields": {"html_parser": name}})
+    return "html.parser"
+
+
+def table_rows_strainer() -> SoupStrainer:
+    """Only the table rows of a catalogue listing page, the rest of the page is never built."""
+    return SoupStrainer("tr")
+
+
+def container_strainer(class_selector: str) -> SoupStrainer:
+    """Only the detail container of an assessment page (matched on its exact class attribute)."""
+    return SoupStrainer("div", attrs={"class": class_selector})
+
+
+def parse_html(page: str, parser: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    return BeautifulSoup(page, parser, parse_only=parse_only)
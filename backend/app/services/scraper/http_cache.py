@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode for a URL that was never cached."""
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class HttpCache:
+    """
+    Content-addressed on-disk cache of crawled pages.
+    Bodies are stored once per SHA-256 of their content under `bodies/`, and every URL has
+    an entry under `entries/` pointing at its body with the validators (ETag, Last-Modified)
+    needed to revalidate it with a conditional GET. Writes are atomic, so concurrent
+    crawler threads and interrupted runs never leave a partial entry behind.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "revalidated": 0, "fetched": 0}
+
+    def _entry_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "entries", key[:2], f"{key}.json")
+
+    def _body_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "bodies", digest[:2], digest)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def get(self, url: str) -> Optional[Dict]:
+        """The cached entry of a URL (url, sha256, etag, last_modified, fetched_at), or None."""
+        try:
+            with open(self._entry_path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry if os.path.exists(self._body_path(entry["sha256"])) else None
+
+    def entries(self) -> Iterator[Dict]:
+        """Every cached entry whose body is present, in no particular order."""
+        for root, _, files in os.walk(os.path.join(self.directory, "entries")):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+                        entry = json.load(f)
+                except json.JSONDecodeError:
+                    continue
+                if os.path.exists(self._body_path(entry["sha256"])):
+                    yield entry
+
+    def read_body(self, entry: Dict) -> str:
+        with open(self._body_path(entry["sha256"]), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Validators to send so an unchanged page comes back as 304 Not Modified."""
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def hit(self, entry: Dict, revalidated: bool) -> str:
+        """Serve a cached body, either replayed as is or confirmed fresh by a 304."""
+        self._count("revalidated" if revalidated else "hits")
+        return self.read_body(entry)
+
+    def put(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        body_path = self._body_path(digest)
+        if not os.path.exists(body_path):
+            _atomic_write(body_path, data)
+        entry = {
+            "url": url,
+            "sha256": digest,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        _atomic_write(self._entry_path(url), json.dumps(entry).encode("utf-8"))
+        self._count("fetched")
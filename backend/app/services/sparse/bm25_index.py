@@ -0,0 +1,124 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+
+# Keeps skill names like "c++", "c#", ".net", "asp.net" and "node.js" as single tokens
+_TOKEN_PATTERN = re.compile(r"\.?[a-z0-9]+(?:\.[a-z0-9]+)*[+#]*")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the their this to was "
+    "were will with who can should".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def indexed_text(doc: Document) -> str:
+    """Assessment name and content, the name also lands in page_content so exact names weigh more."""
+    name = doc.metadata.get("name") or ""
+    return f"{name}\n{doc.page_content}" if name else doc.page_content
+
+
+def document_key(doc: Document) -> str:
+    """Identifies a document by content, so copies returned by any vector store map to the same entry."""
+    return hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed corpus. The inverted index, document lengths and IDF
+    are computed once, so scoring is a handful of dict lookups per query term.
+    Documents outside the corpus can still be scored against the corpus statistics.
+    """
+
+    def __init__(
+        self,
+        documents: List[Document],
+        k1: float = 1.5,
+        b: float = 0.75,
+        text: Callable[[Document], str] = indexed_text
+    ):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.text = text
+        self.positions: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: List[int] = []
+
+        for idx, doc in enumerate(documents):
+            self.positions[document_key(doc)] = idx
+            tokens = tokenize(self.text(doc))
+            self.doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, {})[idx] = tf
+
+        self.avg_doc_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        self.idf = {term: self._idf(len(postings)) for term, postings in self.postings.items()}
+        # Length normalization term of the BM25 denominator, per document
+        self.norms = [self._norm(length) for length in self.doc_lengths]
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _idf(self, df: int) -> float:
+        n = len(self.documents)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _norm(self, length: int) -> float:
+        avg = self.avg_doc_length or length or 1
+        return self.k1 * (1 - self.b + self.b * length / avg)
+
+    def _term_score(self, idf: float, tf: int, norm: float) -> float:
+        return idf * tf * (self.k1 + 1) / (tf + norm)
+
+    def _query_terms(self, query: str) -> List[str]:
+        return list(dict.fromkeys(tokenize(query)))
+
+    def _score_external(self, terms: List[str], doc: Document) -> float:
+        tokens = tokenize(self.text(doc))
+        counts = Counter(tokens)
+        norm = self._norm(len(tokens))
+        return sum(
+            self._term_score(self.idf.get(term, self._idf(0)), counts[term], norm)
+            for term in terms if counts[term]
+        )
+
+    def score(self, query: str, documents: List[Document]) -> List[float]:
+        """BM25 score of each document, in the given order."""
+        terms = self._query_terms(query)
+        scores: List[float] = []
+        for doc in documents:
+            idx: Optional[int] = self.positions.get(document_key(doc))
+            if idx is None:
+                scores.append(self._score_external(terms, doc))
+                continue
+            norm = self.norms[idx]
+            score = 0.0
+            for term in terms:
+                tf = self.postings.get(term, {}).get(idx)
+                if tf:
+                    score += self._term_score(self.idf[term], tf, norm)
+            scores.append(score)
+        return scores
+
+    def search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """Top-k corpus documents for the query, walking only the postings of the query terms."""
+        accumulated: Dict[int, float] = {}
+        for term in self._query_terms(query):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for idx, tf in postings.items():
+                accumulated[idx] = accumulated.get(idx, 0.0) + self._term_score(idf, tf, self.norms[idx])
+
+        top = sorted(accumulated.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.documents[idx], score) for idx, score in top]
@@ -0,0 +1,55 @@
+import threading
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+from app.services.ingester.catalogue_snapshot import read_catalogue_snapshot, to_document
+from app.services.ingester.catalogue_version import get_catalogue_version
+from app.services.sparse.bm25_index import BM25Index
+from app.services.vector_store.snapshot import read_snapshot_documents
+from app.utils.envs import Envs
+from app.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def load_catalogue_documents() -> List[Document]:
+    """
+    Catalogue documents available without a network call: one per assessment from the
+    catalogue snapshot, or else the documents of the local vector store snapshot.
+    """
+    tests = read_catalogue_snapshot(Envs.CATALOGUE_SNAPSHOT_DIR)
+    if tests:
+        return [to_document(test) for test in tests]
+    _, documents = read_snapshot_documents(Envs.LOCAL_VECTOR_STORE_DIR)
+    return documents
+
+
+_catalogue_index: Optional[BM25Index] = None
+_catalogue_index_version: Optional[str] = None
+_catalogue_index_lock = threading.Lock()
+
+
+def get_catalogue_index() -> BM25Index:
+    """
+    BM25 index over the catalogue, shared by its users in the process. It is keyed on the
+    catalogue version like the response cache, and rebuilt once the ingester publishes a new one,
+    so removed assessments and stale IDF do not outlive a re-ingest. Callers should fetch
+    the index per query rather than keep it.
+    """
+    global _catalogue_index, _catalogue_index_version
+    version = get_catalogue_version()
+    if _catalogue_index is not None and _catalogue_index_version == version:
+        return _catalogue_index
+    with _catalogue_index_lock:
+        if _catalogue_index is None or _catalogue_index_version != version:
+            documents = load_catalogue_documents()
+            if not documents:
+                logger.info("no local catalogue documents, BM25 falls back to candidate statistics")
+            _catalogue_index, _catalogue_index_version = BM25Index(documents), version
+            logger.info("catalogue BM25 index built", extra={"fields": {
+                "catalogue_version": version,
+                "documents": len(documents)
+            }})
+        return _catalogue_index
@@ -1,14 +1,13 @@
-from app.services.text_splitter.recursive_splitter import recursive_splitter
-from app.services.text_splitter.character_splitter import character_splitter
-from app.services.text_splitter.token_splitter import token_splitter
 from app.utils.envs import Envs
+from app.utils.registry import LazyRegistry
 
 
-_SPLITTER_MAP = {
-    "recursive": recursive_splitter,
-    "character": character_splitter,
-    "token": token_splitter,
-}
+_SPLITTER_MAP = LazyRegistry({
+    "recursive": "app.services.text_splitter.recursive_splitter:recursive_splitter",
+    "character": "app.services.text_splitter.character_splitter:character_splitter",
+    # Loading the tiktoken encoding downloads it on first use
+    "token": "app.services.text_splitter.token_splitter:token_splitter",
+})
 
 
 def get_text_splitter():
@@ -1,10 +1,13 @@
-from app.services.vector_store.pinecone_vector_store import pinecone_vector_store
 from app.utils.envs import Envs
+from app.utils.registry import LazyRegistry
 
 
-_PROVIDER_MAP = {
-    "pinecone": pinecone_vector_store,
-}
+# Importing the Pinecone store checks (and may create) the index over the network,
+# so it is only imported when selected
+_PROVIDER_MAP = LazyRegistry({
+    "pinecone": "app.services.vector_store.pinecone_vector_store:pinecone_vector_store",
+    "local": "app.services.vector_store.local_vector_store:local_vector_store",
+})
 
 def get_vector_store():
     provider = (getattr(Envs, "VECTOR_STORE") or "pinecone").lower()
@@ -0,0 +1,373 @@
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from app.services.embedder.factory import get_embedder
+from app.services.retriever.metadata_filter import matches_filter
+from app.services.retriever.vector_search import RETRIEVAL_SCORE_KEY
+from app.services.vector_store.snapshot import (
+    CURRENT_FILE,
+    DOCUMENTS_FILE,
+    EMBEDDINGS_FILE,
+    MANIFEST_FILE,
+    read_current_version,
+    read_snapshot_documents,
+)
+from app.utils.envs import Envs
+from app.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class _StoreState(NamedTuple):
+    """Row-aligned ids, documents and vectors, replaced as a whole and never mutated in place."""
+    ids: List[str]
+    documents: List[Document]
+    vectors: np.ndarray
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store that keeps the assessment catalogue embeddings in a
+    NumPy matrix and answers similarity and MMR searches with exact cosine scoring.
+    Vectors are L2-normalized on insert, so cosine similarity is a single dot product.
+
+    The store is persisted as versioned snapshots, each one a float32 `.npy` matrix
+    plus an id-aligned JSONL file (line i describes row i). The `CURRENT` file points
+    at the published version. Snapshots are opened with `mmap_mode="r"`, so several
+    API workers on one host share the same page-cached vectors instead of each
+    holding a private copy.
+
+    Ids, documents and vectors live in one `_StoreState` tuple that writers (upserts,
+    deletes, snapshot reloads) rebuild and swap in a single assignment. A search reads
+    `self._state` once, so a concurrent refresh can never pair new vectors with old documents.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        dimension: int,
+        snapshot_dir: str,
+        keep_versions: int = 3
+    ):
+        self._embedding = embedding
+        self.dimension = dimension
+        self.snapshot_dir = snapshot_dir
+        self.keep_versions = keep_versions
+        self.version: Optional[str] = None
+        self._current_mtime: Optional[int] = None
+        self._state = _StoreState([], [], np.zeros((0, dimension), dtype=np.float32))
+        self.load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32)
+
+    def _to_document(self, state: _StoreState, idx: int, score: Optional[float] = None) -> Document:
+        # Return a copy so callers can mutate metadata without touching the store
+        doc = state.documents[idx]
+        metadata = dict(doc.metadata)
+        if score is not None:
+            # Search results carry their cosine score, e.g. for the adaptive candidate budget
+            metadata[RETRIEVAL_SCORE_KEY] = score
+        return Document(id=state.ids[idx], page_content=doc.page_content, metadata=metadata)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """Add texts, texts whose id is already in the store replace the stored document (upsert)."""
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+
+        vectors = self._normalize(np.asarray(self._embedding.embed_documents(texts), dtype=np.float32))
+
+        # Build the new state from copies, searches keep reading the current one until the swap
+        state = self._state
+        new_ids, new_documents = list(state.ids), list(state.documents)
+        positions = {doc_id: idx for idx, doc_id in enumerate(new_ids)}
+        replaced = {}
+        new_rows: List[int] = []
+        for row, (doc_id, text, metadata) in enumerate(zip(ids, texts, metadatas)):
+            document = Document(page_content=text, metadata=metadata)
+            if doc_id in positions:
+                idx = positions[doc_id]
+                new_documents[idx] = document
+                replaced[idx] = row
+                continue
+            positions[doc_id] = len(new_ids)
+            new_ids.append(doc_id)
+            new_documents.append(document)
+            new_rows.append(row)
+
+        new_vectors = state.vectors
+        if replaced:
+            # Also needed because snapshot rows are a read-only memory map
+            new_vectors = np.array(new_vectors)
+            new_vectors[list(replaced)] = vectors[list(replaced.values())]
+        if new_rows:
+            new_vectors = np.vstack([new_vectors, vectors[new_rows]])
+        self._state = _StoreState(new_ids, new_documents, new_vectors)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: Optional[bool] = None, **kwargs: Any) -> bool:
+        """Delete by ids, or everything with `delete_all`, the same keywords as PineconeVectorStore.delete."""
+        if delete_all:
+            self._state = _StoreState([], [], np.zeros((0, self.dimension), dtype=np.float32))
+            return True
+
+        state = self._state
+        to_delete = set(ids or [])
+        keep = [idx for idx, doc_id in enumerate(state.ids) if doc_id not in to_delete]
+        self._state = _StoreState(
+            [state.ids[idx] for idx in keep], [state.documents[idx] for idx in keep], state.vectors[keep]
+        )
+        return True
+
+    def get_by_ids(self, ids, /) -> List[Document]:
+        state = self._state
+        positions = {doc_id: idx for idx, doc_id in enumerate(state.ids)}
+        return [self._to_document(state, positions[doc_id]) for doc_id in ids if doc_id in positions]
+
+    def _select_relevance_score_fn(self):
+        # Cosine similarity in [-1, 1] mapped to a [0, 1] relevance score
+        return lambda score: (score + 1.0) / 2.0
+
+    def _scores(self, embedding: List[float], filter: Optional[dict] = None) -> Tuple[_StoreState, np.ndarray]:
+        """
+        The state searched and the cosine score of each of its rows, -inf for the rows whose
+        metadata does not match `filter`. Callers resolve rows against that state only.
+        """
+        self.refresh()
+        state = self._state
+        query = self._normalize(np.asarray(embedding, dtype=np.float32))
+        scores = state.vectors @ query
+        if filter:
+            matching = np.fromiter(
+                (matches_filter(doc.metadata, filter) for doc in state.documents), dtype=bool, count=len(state.documents)
+            )
+            scores = np.where(matching, scores, np.float32(-np.inf))
+        return state, scores
+
+    def _top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, scores.shape[0])
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        # Filtered out rows only fill the partition when fewer than k rows match
+        return top[np.isfinite(scores[top])]
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        state, scores = self._scores(embedding, filter)
+        return [(self._to_document(state, idx, float(scores[idx])), float(scores[idx])) for idx in self._top_k(scores, k)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k, **kwargs)
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        state, scores = self._scores(embedding, filter)
+        candidates = self._top_k(scores, fetch_k)
+        if not candidates.size:
+            return []
+
+        # One matmul for all pairwise candidate similarities, then a greedy pass
+        # that keeps the running max similarity to the selected set up to date
+        candidate_vectors = state.vectors[candidates]
+        pairwise = candidate_vectors @ candidate_vectors.T
+        relevance = scores[candidates]
+        redundancy = np.full(candidates.shape[0], -np.inf, dtype=np.float32)
+        available = np.ones(candidates.shape[0], dtype=bool)
+        selected: List[int] = []
+
+        for _ in range(min(k, candidates.shape[0])):
+            if selected:
+                mmr = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+            else:
+                mmr = relevance.copy()
+            mmr[~available] = -np.inf
+            best = int(np.argmax(mmr))
+            selected.append(int(candidates[best]))
+            available[best] = False
+            redundancy = np.maximum(redundancy, pairwise[:, best])
+
+        return [self._to_document(state, idx, float(scores[idx])) for idx in selected]
+
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any
+    ) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self._embedding.embed_query(query), k, fetch_k, lambda_mult, **kwargs
+        )
+
+    # Searching is in-process, only the query embedding needs to be awaited
+
+    async def asimilarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        embedding = await self._embedding.aembed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        embedding = await self._embedding.aembed_query(query)
+        return self.similarity_search_by_vector(embedding, k, **kwargs)
+
+    async def amax_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any
+    ) -> List[Document]:
+        embedding = await self._embedding.aembed_query(query)
+        return self.max_marginal_relevance_search_by_vector(embedding, k, fetch_k, lambda_mult, **kwargs)
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> "LocalVectorStore":
+        store = cls(
+            embedding=embedding,
+            dimension=kwargs.get("dimension", len(embedding.embed_query("dimension probe"))),
+            snapshot_dir=kwargs.get("snapshot_dir", Envs.LOCAL_VECTOR_STORE_DIR)
+        )
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    def _current_path(self) -> str:
+        return os.path.join(self.snapshot_dir, CURRENT_FILE)
+
+    def persist(self) -> str:
+        """
+        Write the current vectors and documents as a new snapshot version and
+        atomically point `CURRENT` at it. Returns the published version.
+        """
+        # Version names sort chronologically, which `_prune_versions` relies on
+        now_ns = time.time_ns()
+        version = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now_ns // 10**9))}-{now_ns % 10**9:09d}"
+        version_dir = os.path.join(self.snapshot_dir, version)
+        staging_dir = version_dir + ".tmp"
+        os.makedirs(staging_dir, exist_ok=True)
+
+        state = self._state
+        np.save(
+            os.path.join(staging_dir, EMBEDDINGS_FILE),
+            np.ascontiguousarray(state.vectors, dtype=np.float32)
+        )
+        with open(os.path.join(staging_dir, DOCUMENTS_FILE), "w", encoding="utf-8") as f:
+            for doc_id, doc in zip(state.ids, state.documents):
+                f.write(json.dumps({"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata}) + "\n")
+        with open(os.path.join(staging_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "version": version,
+                "count": len(state.ids),
+                "dimension": self.dimension,
+                "created_at": time.time()
+            }, f, indent=4)
+        os.replace(staging_dir, version_dir)
+
+        current_tmp = self._current_path() + ".tmp"
+        with open(current_tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(current_tmp, self._current_path())
+
+        self.version = version
+        self._current_mtime = os.stat(self._current_path()).st_mtime_ns
+        self._prune_versions()
+        logger.info("local vector store persisted", extra={"fields": {"version": version, "vectors": len(state.ids)}})
+        return version
+
+    def _prune_versions(self) -> None:
+        versions = sorted(
+            name for name in os.listdir(self.snapshot_dir)
+            if os.path.isdir(os.path.join(self.snapshot_dir, name)) and not name.endswith(".tmp")
+        )
+        for name in versions[:-self.keep_versions]:
+            if name != self.version:
+                shutil.rmtree(os.path.join(self.snapshot_dir, name), ignore_errors=True)
+
+    def load(self) -> None:
+        """Memory-map the published snapshot, if one has been written."""
+        version = read_current_version(self.snapshot_dir)
+        if version is None:
+            logger.info("no local vector store snapshot, starting empty", extra={"fields": {"snapshot_dir": self.snapshot_dir}})
+            return
+
+        version_dir = os.path.join(self.snapshot_dir, version)
+        vectors = np.load(os.path.join(version_dir, EMBEDDINGS_FILE), mmap_mode="r")
+        if vectors.dtype != np.float32 or vectors.ndim != 2:
+            raise ValueError(f"Invalid embedding matrix in snapshot {version_dir}: {vectors.dtype}{vectors.shape}")
+
+        ids, documents = read_snapshot_documents(self.snapshot_dir, version)
+        if len(ids) != vectors.shape[0]:
+            raise ValueError(f"Snapshot {version_dir} has {vectors.shape[0]} vectors but {len(ids)} documents")
+
+        self._state = _StoreState(ids, documents, vectors)
+        self.version = version
+        self._current_mtime = os.stat(self._current_path()).st_mtime_ns
+        logger.info("local vector store snapshot loaded", extra={"fields": {"version": version, "vectors": len(ids)}})
+
+    def refresh(self) -> None:
+        """Reload when another process (e.g. the ingester) has published a new version."""
+        try:
+            mtime = os.stat(self._current_path()).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._current_mtime and read_current_version(self.snapshot_dir) != self.version:
+            self.load()
+        self._current_mtime = mtime
+
+
+local_vector_store = LocalVectorStore(
+    embedding=get_embedder()["embedder"],
+    dimension=get_embedder()["dimension"],
+    snapshot_dir=Envs.LOCAL_VECTOR_STORE_DIR,
+    keep_versions=Envs.LOCAL_VECTOR_STORE_KEEP_VERSIONS
+)
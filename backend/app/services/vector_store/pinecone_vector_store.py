@@ -1,9 +1,81 @@
 import time
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
 from langchain_pinecone import PineconeVectorStore
 from pinecone import Pinecone, ServerlessSpec
 
 from app.utils.envs import Envs
 from app.services.embedder.factory import get_embedder
+from app.services.retriever.vector_search import RETRIEVAL_SCORE_KEY
+
+
+class ScoredPineconeVectorStore(PineconeVectorStore):
+    """
+    PineconeVectorStore whose MMR results carry the similarity score Pinecone returned for
+    them, under the same metadata key as the local vector store's, so the adaptive candidate
+    budget also works on the MMR retriever. The scores come with the candidate pool query
+    MMR selects from, no extra round trip is made.
+    """
+
+    def _select_mmr(self, embedding: List[float], matches: List[Any], k: int, lambda_mult: float) -> List[Document]:
+        selected = maximal_marginal_relevance(
+            np.array([embedding], dtype=np.float32),
+            [match["values"] for match in matches],
+            k=k,
+            lambda_mult=lambda_mult
+        )
+        documents = []
+        for idx in selected:
+            metadata = dict(matches[idx]["metadata"])
+            page_content = metadata.pop(self._text_key)
+            metadata[RETRIEVAL_SCORE_KEY] = matches[idx]["score"]
+            documents.append(Document(page_content=page_content, metadata=metadata))
+        return documents
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        namespace: Optional[str] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        results = self.index.query(
+            vector=embedding,
+            top_k=fetch_k,
+            include_values=True,
+            include_metadata=True,
+            namespace=self._namespace if namespace is None else namespace,
+            filter=filter
+        )
+        return self._select_mmr(embedding, results["matches"], k, lambda_mult)
+
+    async def amax_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        namespace: Optional[str] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        async with self._async_index_context() as idx:
+            results = await idx.query(
+                vector=embedding,
+                top_k=fetch_k,
+                include_values=True,
+                include_metadata=True,
+                namespace=self._namespace if namespace is None else namespace,
+                filter=filter
+            )
+        return self._select_mmr(embedding, results["matches"], k, lambda_mult)
+
 
 pc = Pinecone(api_key=Envs.PINECONE_API_KEY)
 index_name = Envs.PINECONE_INDEX_NAME
@@ -22,7 +94,7 @@ if not pc.has_index(index_name):
 
 index = pc.Index(index_name)
 
-pinecone_vector_store = PineconeVectorStore(
+pinecone_vector_store = ScoredPineconeVectorStore(
     embedding=get_embedder()["embedder"], 
     index=index
 )
@@ -0,0 +1,39 @@
+import json
+import os
+from typing import List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+
+CURRENT_FILE = "CURRENT"
+EMBEDDINGS_FILE = "embeddings.npy"
+DOCUMENTS_FILE = "documents.jsonl"
+MANIFEST_FILE = "manifest.json"
+
+
+def read_current_version(snapshot_dir: str) -> Optional[str]:
+    """Published version of a local vector store snapshot, or None if nothing was published."""
+    try:
+        with open(os.path.join(snapshot_dir, CURRENT_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_snapshot_documents(snapshot_dir: str, version: Optional[str] = None) -> Tuple[List[str], List[Document]]:
+    """
+    Read the id-aligned documents of a snapshot version (the published one by default),
+    without loading the embedding matrix.
+    """
+    version = version or read_current_version(snapshot_dir)
+    if version is None:
+        return [], []
+
+    ids: List[str] = []
+    documents: List[Document] = []
+    with open(os.path.join(snapshot_dir, version, DOCUMENTS_FILE), "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            ids.append(record["id"])
+            documents.append(Document(page_content=record["page_content"], metadata=record["metadata"]))
+    return ids, documents
@@ -8,20 +8,80 @@ class Envs:
     BASE_SHL_URL: str = os.getenv("BASE_SHL_URL", "https://www.shl.com/solutions")
     SHL_PRODUCT_CATALOGUE_URL: str = os.getenv("SHL_PRODUCT_CATALOGUE_URL", "")
     EMBEDDER: str = os.getenv("EMBEDDER", "google")
+    CACHE_DIR: str = os.getenv("CACHE_DIR", "data/cache")
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+    EMBEDDING_CACHE_DISK_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_DISK_ENTRIES", "10000"))
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))
+    EMBEDDING_CONCURRENCY: int = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+    EMBEDDING_RATE_LIMIT: float = float(os.getenv("EMBEDDING_RATE_LIMIT", "5"))
+    EMBEDDING_MAX_RETRIES: int = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+    EMBEDDING_BACKOFF: float = float(os.getenv("EMBEDDING_BACKOFF", "2"))
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     COHERE_API_KEY: str = os.getenv("COHERE_API_KEY", "")
     VECTOR_STORE: str = os.getenv("VECTOR_STORE", "pinecone")
     PINECONE_API_KEY: str = os.getenv("PINECONE_API_KEY", "")
     PINECONE_INDEX_NAME: str = os.getenv("PINECONE_INDEX_NAME", "shl-assessments")
+    LOCAL_VECTOR_STORE_DIR: str = os.getenv("LOCAL_VECTOR_STORE_DIR", "data/vector_store")
+    LOCAL_VECTOR_STORE_KEEP_VERSIONS: int = int(os.getenv("LOCAL_VECTOR_STORE_KEEP_VERSIONS", "3"))
     TEXT_SPLITTER: str = os.getenv("TEXT_SPLITTER", "recursive")
     LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "groq")
+    QUERY_CACHE_ENABLED: bool = os.getenv("QUERY_CACHE_ENABLED", "false").lower() == "true"
+    QUERY_CACHE_SIZE: int = int(os.getenv("QUERY_CACHE_SIZE", "512"))
+    QUERY_CACHE_DISK_ENTRIES: int = int(os.getenv("QUERY_CACHE_DISK_ENTRIES", "5000"))
+    QUERY_CACHE_TTL: float = float(os.getenv("QUERY_CACHE_TTL", "86400"))
+    SCRAPER_WORKERS: int = int(os.getenv("SCRAPER_WORKERS", "8"))
+    SCRAPER_RATE_LIMIT: float = float(os.getenv("SCRAPER_RATE_LIMIT", "4"))
+    SCRAPER_BURST: float = float(os.getenv("SCRAPER_BURST", "4"))
+    SCRAPER_MAX_RETRIES: int = int(os.getenv("SCRAPER_MAX_RETRIES", "3"))
+    SCRAPER_BACKOFF: float = float(os.getenv("SCRAPER_BACKOFF", "0.5"))
+    SCRAPER_TIMEOUT: float = float(os.getenv("SCRAPER_TIMEOUT", "30"))
+    SCRAPER_CACHE_ENABLED: bool = os.getenv("SCRAPER_CACHE_ENABLED", "true").lower() == "true"
+    SCRAPER_CACHE_DIR: str = os.getenv("SCRAPER_CACHE_DIR", "data/http_cache")
+    SCRAPER_OFFLINE: bool = os.getenv("SCRAPER_OFFLINE", "false").lower() == "true"
+    HTML_PARSER: str = os.getenv("HTML_PARSER", "auto")
+    HTML_PARSE_ONLY: bool = os.getenv("HTML_PARSE_ONLY", "true").lower() == "true"
+    INGEST_MANIFEST_PATH: str = os.getenv("INGEST_MANIFEST_PATH", "data/ingest_manifest.json")
+    CATALOGUE_SNAPSHOT_DIR: str = os.getenv("CATALOGUE_SNAPSHOT_DIR", "data/catalogue")
+    CATALOGUE_SNAPSHOT_KEEP_VERSIONS: int = int(os.getenv("CATALOGUE_SNAPSHOT_KEEP_VERSIONS", "3"))
+    INGEST_QUEUE_SIZE: int = int(os.getenv("INGEST_QUEUE_SIZE", "32"))
+    INGEST_CRAWL_WORKERS: int = int(os.getenv("INGEST_CRAWL_WORKERS", "2"))
+    INGEST_PARSE_WORKERS: int = int(os.getenv("INGEST_PARSE_WORKERS", os.getenv("SCRAPER_WORKERS", "8")))
+    INGEST_EMBED_WORKERS: int = int(os.getenv("INGEST_EMBED_WORKERS", "2"))
+    INGEST_UPSERT_BATCH_SIZE: int = int(os.getenv("INGEST_UPSERT_BATCH_SIZE", "32"))
     SCRAPER_USER_AGENT: str = os.getenv("SCRAPER_USER_AGENT", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3")
     RETRIEVER_PROVIDER: str = os.getenv("RETRIEVER_PROVIDER", "mmr")
     RERANKER_PROVIDER: str = os.getenv("RERANKER_PROVIDER", "pinecone")
     RERANKER_TOP_N: int  = int(os.getenv("RERANKER_TOP_N", "20"))
+    LLM_RERANKER_MODE: str = os.getenv("LLM_RERANKER_MODE", "listwise")
+    LLM_RERANKER_BATCH_SIZE: int = int(os.getenv("LLM_RERANKER_BATCH_SIZE", "10"))
+    LLM_RERANKER_CONCURRENCY: int = int(os.getenv("LLM_RERANKER_CONCURRENCY", "8"))
+    LLM_RERANKER_TIMEOUT: float = float(os.getenv("LLM_RERANKER_TIMEOUT", "10"))
     MIN_RESULTS: int  = int(os.getenv("MIN_RESULTS", "5"))
     MAX_RESULTS: int  = int(os.getenv("MAX_RESULTS", "10"))
     TOP_K: int  = int(os.getenv("TOP_K", "50"))
     FETCH_K: int  = int(os.getenv("FETCH_K", "100"))
     LAMBDA_MULT: float = float(os.getenv("LAMBDA_MULT", "0.7"))
+    RETRIEVAL_FILTER_MODE: str = os.getenv("RETRIEVAL_FILTER_MODE", "off").lower()
+    FILTERED_TOP_K: int = int(os.getenv("FILTERED_TOP_K", "30"))
+    FILTERED_FETCH_K: int = int(os.getenv("FILTERED_FETCH_K", "60"))
+    ADAPTIVE_CANDIDATES: bool = os.getenv("ADAPTIVE_CANDIDATES", "false").lower() == "true"
+    ADAPTIVE_MIN_CANDIDATES: int = int(os.getenv("ADAPTIVE_MIN_CANDIDATES", "15"))
+    ADAPTIVE_GAP_RATIO: float = float(os.getenv("ADAPTIVE_GAP_RATIO", "0.25"))
+    ADAPTIVE_PLATEAU_RATIO: float = float(os.getenv("ADAPTIVE_PLATEAU_RATIO", "0.2"))
+    ADAPTIVE_MIN_SPREAD: float = float(os.getenv("ADAPTIVE_MIN_SPREAD", "0.02"))
+    HYBRID_SPARSE_K: int = int(os.getenv("HYBRID_SPARSE_K", "50"))
+    HYBRID_RRF_K: int = int(os.getenv("HYBRID_RRF_K", "60"))
+    SPECULATIVE_RETRIEVAL: bool = os.getenv("SPECULATIVE_RETRIEVAL", "false").lower() == "true"
+    BATCH_MAX_QUERIES: int = int(os.getenv("BATCH_MAX_QUERIES", "50"))
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "4"))
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_QUERY: str = os.getenv("WARMUP_QUERY", "Java developer who can collaborate with business teams, test under 40 minutes")
+    CATALOGUE_VERSION_FILE: str = os.getenv("CATALOGUE_VERSION_FILE", "data/catalogue_version")
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+    RESPONSE_CACHE_DISK_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_DISK_ENTRIES", "10000"))
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", "86400"))
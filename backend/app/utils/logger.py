@@ -0,0 +1,40 @@
+import logging
+import sys
+from typing import Any
+
+from app.utils.envs import Envs
+
+
+class KeyValueFormatter(logging.Formatter):
+    """
+    Formats records as `time level logger message key=value ...`, where the
+    key/value pairs come from the `fields` dict passed through `extra`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={_format_value(value)}" for key, value in fields.items())
+        return line
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, float):
+        value = round(value, 4)
+    text = str(value)
+    return f'"{text}"' if (" " in text or not text) else text
+
+
+_handler = logging.StreamHandler(sys.stdout)
+_handler.setFormatter(KeyValueFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+
+_app_logger = logging.getLogger("app")
+_app_logger.addHandler(_handler)
+_app_logger.setLevel(Envs.LOG_LEVEL.upper())
+_app_logger.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the `app` namespace, gated by `LOG_LEVEL`. Pass structured fields with `extra={"fields": {...}}`."""
+    return logging.getLogger(name if name.startswith("app") else f"app.{name}")
@@ -0,0 +1,189 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.utils.cache import TieredCache
+
+
+LabelValues = Tuple[str, ...]
+
+# Seconds, spans everything from a BM25 rerank to a slow LLM rewrite
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels, rendered in the Prometheus text format.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels, rendered in the Prometheus text format,
+    so latency percentiles can be computed with `histogram_quantile`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: bucket counts (last slot is +Inf), sum, count
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts, totals = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0, 0.0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, (total, count)) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {int(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the process metrics and the caches whose counters are exported with them.
+    """
+
+    def __init__(self):
+        self._metrics: List = []
+        self._caches: Dict[str, TieredCache] = {}
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_cache(self, cache: TieredCache) -> TieredCache:
+        """Export the hit/miss counters of a cache alongside the metrics."""
+        self._caches[cache.name] = cache
+        return cache
+
+    def _render_caches(self) -> List[str]:
+        stats = [cache.stats() for cache in self._caches.values()]
+        lines = [
+            "# HELP cache_hits_total Cache lookups answered from the given tier.",
+            "# TYPE cache_hits_total counter",
+        ]
+        for stat in stats:
+            lines.append(f'cache_hits_total{{cache="{stat["name"]}",tier="memory"}} {stat["memory_hits"]}')
+            lines.append(f'cache_hits_total{{cache="{stat["name"]}",tier="disk"}} {stat["disk_hits"]}')
+        lines += ["# HELP cache_misses_total Cache lookups that missed every tier.", "# TYPE cache_misses_total counter"]
+        lines += [f'cache_misses_total{{cache="{stat["name"]}"}} {stat["misses"]}' for stat in stats]
+        lines += ["# HELP cache_memory_entries Entries held in the in-memory tier.", "# TYPE cache_memory_entries gauge"]
+        lines += [f'cache_memory_entries{{cache="{stat["name"]}"}} {stat["memory_entries"]}' for stat in stats]
+        return lines
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines += metric.render()
+        lines += self._render_caches()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "recommender_stage_duration_seconds",
+    "Duration of each recommendation pipeline stage.",
+    labelnames=("stage",)
+))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    "recommender_stage_errors_total",
+    "Pipeline stages that raised.",
+    labelnames=("stage",)
+))
+UPSTREAM_ERRORS = REGISTRY.register(Counter(
+    "upstream_errors_total",
+    "Failed or timed out calls to upstream services.",
+    labelnames=("upstream",)
+))
+REQUESTS = REGISTRY.register(Counter(
+    "recommend_requests_total",
+    "Recommendation requests by route and response cache status.",
+    labelnames=("route", "cache")
+))
+
+
+@contextmanager
+def stage_span(stage: str, upstream: Optional[str] = None) -> Iterator[None]:
+    """
+    Time a pipeline stage into `recommender_stage_duration_seconds`. Exceptions are
+    counted per stage, and per upstream service when the stage calls one.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        if upstream is not None:
+            UPSTREAM_ERRORS.inc(upstream=upstream)
+        raise
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage=stage)
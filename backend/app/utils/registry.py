@@ -0,0 +1,44 @@
+import importlib
+import threading
+from typing import Any, Callable, Dict, List, Union
+
+
+Provider = Union[str, Callable[[], Any]]
+
+
+class LazyRegistry:
+    """
+    Provider name -> provider, resolved on first use. A provider is either a
+    `"package.module:attribute"` path, whose module is only imported when that provider
+    is requested, or a zero-argument builder. Resolved providers are cached, so every
+    caller shares one instance, as with the module-level singletons they point to.
+    Importing a factory therefore costs nothing for the providers that are never selected.
+    """
+
+    def __init__(self, providers: Dict[str, Provider]):
+        self._providers = providers
+        self._resolved: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._providers
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._resolved:
+            return self._resolved[name]
+        with self._lock:
+            if name not in self._resolved:
+                self._resolved[name] = self._resolve(self._providers[name])
+            return self._resolved[name]
+
+    def _resolve(self, provider: Provider) -> Any:
+        if callable(provider):
+            return provider()
+        module_name, _, attribute = provider.partition(":")
+        return getattr(importlib.import_module(module_name), attribute)
+
+    def names(self) -> List[str]:
+        return list(self._providers)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._resolved
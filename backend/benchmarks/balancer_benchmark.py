@@ -0,0 +1,134 @@
+"""
+Micro-benchmark and equivalence check of the ResultBalancer selection.
+
+`reference_selection` is the brute-force definition of the greedy balancer: before every pick it
+re-scores every remaining candidate and takes the best one (the higher-ranked one on ties).
+The benchmark first checks on randomized inputs (duplicate URLs, tied and zero scores, every
+duration preference, varying MIN/MAX_RESULTS) that `ResultBalancer.balance_selection` picks exactly
+the same documents, then times both on growing candidate lists.
+
+Usage (from backend/):
+    python -m benchmarks.balancer_benchmark [--cases 2000] [--seed 0]
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+from app.pydantic_models.data_model import PreferredIntent
+from app.services.balancer.balancer import ResultBalancer
+from app.utils.envs import Envs
+
+
+TEST_TYPES = list("ABCDEKPS")
+
+
+def reference_selection(
+    balancer: ResultBalancer, reranked_docs: List[Tuple[Document, float]], intent: PreferredIntent
+) -> List[Document]:
+    if not reranked_docs:
+        return []
+    top_score = max(score for _, score in reranked_docs)
+    threshold = top_score * balancer.RATIO
+    appearance_counts = defaultdict(int)
+    final_docs: List[Document] = []
+    selected_urls = set()
+    while len(final_docs) < Envs.MAX_RESULTS:
+        best = None
+        for doc, score in reranked_docs:
+            if doc.metadata["url"] in selected_urls:
+                continue
+            adjusted = (
+                (score / top_score if top_score > 0 else 0.0)
+                + balancer.duration_bonus(doc.metadata.get("duration"), intent)
+                - balancer.balance_penalty(doc.metadata["test_type"], appearance_counts, intent)
+            )
+            if best is None or adjusted > best[0]:
+                best = (adjusted, doc)
+        if best is None:
+            break
+        adjusted, doc = best
+        if len(final_docs) >= Envs.MIN_RESULTS and adjusted < threshold:
+            break
+        final_docs.append(doc)
+        balancer.update_counts(doc.metadata["test_type"], appearance_counts)
+        selected_urls.add(doc.metadata["url"])
+    return final_docs
+
+
+def random_case(rng: random.Random, size: int) -> Tuple[List[Tuple[Document, float]], PreferredIntent]:
+    # Few distinct scores and URLs, so ties and duplicate chunks are frequent
+    scores = sorted((round(rng.choice([0.0, rng.random()]), rng.choice([1, 2, 6])) for _ in range(size)), reverse=True)
+    docs = [
+        (
+            Document(page_content="", metadata={
+                "url": f"u{rng.randrange(max(size, 1))}",
+                "test_type": rng.sample(TEST_TYPES, rng.randint(1, 3)),
+                "duration": rng.choice([0, 10, 30, 31, 45, 60, 61, 90]),
+            }),
+            score
+        )
+        for score in scores
+    ]
+    intent = PreferredIntent(
+        preferred_test_types=rng.sample(TEST_TYPES, rng.randint(0, 3)),
+        duration_preference=rng.choice([None, "short", "medium", "long"])
+    )
+    return docs, intent
+
+
+def urls(docs: List[Document]) -> List[str]:
+    return [doc.metadata["url"] for doc in docs]
+
+
+def check_equivalence(balancer: ResultBalancer, cases: int, rng: random.Random) -> None:
+    min_results, max_results = Envs.MIN_RESULTS, Envs.MAX_RESULTS
+    try:
+        for case in range(cases):
+            Envs.MIN_RESULTS = rng.randint(0, 6)
+            Envs.MAX_RESULTS = rng.randint(Envs.MIN_RESULTS, 12)
+            docs, intent = random_case(rng, rng.randint(0, 60))
+            expected = urls(reference_selection(balancer, docs, intent))
+            actual = urls(balancer.balance_selection(docs, intent))
+            if actual != expected:
+                raise SystemExit(f"Case {case}: balancer picked {actual}, reference picked {expected}")
+    finally:
+        Envs.MIN_RESULTS, Envs.MAX_RESULTS = min_results, max_results
+    print(f"{cases} random cases: identical selections")
+
+
+def best_time(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    balancer = ResultBalancer()
+    check_equivalence(balancer, args.cases, rng)
+
+    print(f"MIN_RESULTS={Envs.MIN_RESULTS} MAX_RESULTS={Envs.MAX_RESULTS}")
+    for size in (20, 50, 200, 1000):
+        docs, intent = random_case(rng, size)
+        heap_seconds = best_time(lambda: balancer.balance_selection(docs, intent))
+        reference_seconds = best_time(lambda: reference_selection(balancer, docs, intent))
+        print(
+            f"{size:>5} candidates  heap {heap_seconds * 1000:8.3f} ms  "
+            f"brute force {reference_seconds * 1000:8.3f} ms  {reference_seconds / heap_seconds:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Import-time benchmark of the API, i.e. the part of a cold start spent before the first request.
+
+Imports the API module in fresh interpreters and reports the median import time, then lists
+which provider modules and SDKs the import pulled in. With the lazy provider registry none
+should be loaded at import time; `--build` also times building the recommendation pipeline,
+which imports and builds only the providers selected by the environment (this one needs credentials).
+
+Usage (from backend/):
+    python -m benchmarks.import_benchmark [--runs 5] [--module app.services.api.main] [--build]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+PROVIDER_PACKAGES = ("llm", "reranker", "retriever", "vector_store", "embedder", "text_splitter")
+SDK_MODULES = ("pinecone", "langchain_pinecone", "langchain_cohere", "langchain_groq", "langchain_google_genai", "tiktoken")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter() - start
+built = None
+if {build}:
+    from app.services.api.pipeline import build_recommender
+    start = time.perf_counter()
+    build_recommender()
+    built = time.perf_counter() - start
+print(json.dumps({{"import": imported, "build": built, "modules": sorted(sys.modules)}}))
+"""
+
+
+def probe(module: str, build: bool) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, build=build)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--module", default="app.services.api.main")
+    parser.add_argument("--build", action="store_true")
+    args = parser.parse_args()
+
+    results = [probe(args.module, args.build) for _ in range(args.runs)]
+    print(f"import {args.module}: median {statistics.median(r['import'] for r in results) * 1000:.0f} ms over {args.runs} runs")
+    if args.build:
+        print(f"build_recommender: median {statistics.median(r['build'] for r in results) * 1000:.0f} ms")
+
+    modules = results[-1]["modules"]
+    providers = [
+        name for name in modules
+        if any(name.startswith(f"app.services.{package}.") for package in PROVIDER_PACKAGES)
+        and not name.endswith((".factory", ".base_reranker", ".vector_search", ".metadata_filter"))
+    ]
+    sdks = [name for name in SDK_MODULES if name in modules]
+    print(f"provider modules loaded: {', '.join(providers) or 'none'}")
+    print(f"provider SDKs loaded: {', '.join(sdks) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
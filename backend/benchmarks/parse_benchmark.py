@@ -0,0 +1,139 @@
+"""
+Parse micro-benchmark of the SHL scrapers.
+
+Runs pages through every parser configuration: `html.parser` and lxml, each on the whole page
+and restricted to the extracted elements (`parse_only`). By default the pages are the synthetic
+fixtures in `benchmarks/fixtures/shl_pages`: two catalogue listing pages and eight assessment
+pages written by hand in the markup the scrapers select on, inside generated site chrome, with
+`urls.txt` giving the SHL URL each one stands in for. They are not saves of the live site, so
+their timings only indicate the speedup; `--cache-dir` replays the real pages of the scraper
+HTTP cache instead (`SCRAPER_CACHE_DIR`, filled by any ingestion run). The baseline is the original configuration, the whole
+page with `html.parser`. Every configuration must extract the same `IndividualTest` records,
+page content included, as the baseline, otherwise the benchmark fails.
+
+Usage (from backend/):
+    python -m benchmarks.parse_benchmark [--pages-dir benchmarks/fixtures/shl_pages] [--cache-dir data/http_cache] [--repeat 5]
+"""
+import argparse
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.pydantic_models.data_model import IndividualTest
+from app.services.scraper.assessment_scraper import AssessmentScraper
+from app.services.scraper.catalogue_scraper import CatalogueScraper
+from app.services.scraper.html_parser import lxml_available
+from app.services.scraper.http_cache import HttpCache
+from app.utils.envs import Envs
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "shl_pages")
+URLS_FILE = "urls.txt"
+
+
+def split_pages(pages: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Pages split into catalogue listing pages and assessment detail pages, keyed by URL."""
+    catalogue_pages = {url: page for url, page in pages.items() if "start=" in url}
+    assessment_pages = {url: page for url, page in pages.items() if "start=" not in url}
+    return dict(sorted(catalogue_pages.items())), dict(sorted(assessment_pages.items()))
+
+
+def load_fixture_pages(pages_dir: str) -> Dict[str, str]:
+    """Fixture pages of a directory keyed by URL, as listed in its `urls.txt` (`<file> <url>` lines)."""
+    pages: Dict[str, str] = {}
+    with open(os.path.join(pages_dir, URLS_FILE), "r", encoding="utf-8") as f:
+        entries = [line.split() for line in f if line.strip() and not line.startswith("#")]
+    for name, url in entries:
+        with open(os.path.join(pages_dir, name), "r", encoding="utf-8") as f:
+            pages[url] = f.read()
+    return pages
+
+
+def load_cached_pages(cache_dir: str) -> Dict[str, str]:
+    """Pages in the scraper HTTP cache keyed by URL."""
+    cache = HttpCache(cache_dir)
+    return {entry["url"]: cache.read_body(entry) for entry in cache.entries()}
+
+
+def placeholder_test(url: str) -> IndividualTest:
+    """Listing fields of an assessment whose catalogue page is not cached."""
+    return IndividualTest(
+        url=url,
+        name=url.rstrip("/").rsplit("/", 1)[-1],
+        description="",
+        duration=0,
+        remote_support=False,
+        adaptive_support=False,
+        test_type=[]
+    )
+
+
+def extract(
+    parser: str, parse_only: bool, catalogue_pages: Dict[str, str], assessment_pages: Dict[str, str]
+) -> List[Tuple[Dict, str]]:
+    """Every record the scrapers extract from the pages, as (fields, page content) pairs."""
+    scrapers = dict(http_cache=None, parser=parser, parse_only=parse_only)
+    catalogue_scraper = CatalogueScraper(**scrapers)
+    assessment_scraper = AssessmentScraper(**scrapers)
+
+    listed: Dict[str, IndividualTest] = {}
+    for url, page in catalogue_pages.items():
+        for test in catalogue_scraper.parse_individual_tests(page, url):
+            listed[test.url] = test
+
+    records = [(test.model_dump(), "") for test in listed.values()]
+    for url, page in assessment_pages.items():
+        test = (listed[url] if url in listed else placeholder_test(url)).model_copy()
+        assessment_scraper.parse_assessment_details(test, page)
+        records.append((test.model_dump(), test.page_content or ""))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages-dir", default=FIXTURE_DIR, help="directory of fixture pages with a urls.txt (default: the synthetic fixtures)")
+    parser.add_argument(
+        "--cache-dir", nargs="?", const=Envs.SCRAPER_CACHE_DIR, default=None,
+        help=f"replay the scraper HTTP cache instead (default: {Envs.SCRAPER_CACHE_DIR})"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cache_dir: Optional[str] = args.cache_dir
+    source = cache_dir if cache_dir is not None else args.pages_dir
+    pages = load_cached_pages(cache_dir) if cache_dir is not None else load_fixture_pages(args.pages_dir)
+    catalogue_pages, assessment_pages = split_pages(pages)
+    total_pages = len(catalogue_pages) + len(assessment_pages)
+    if not total_pages:
+        raise SystemExit(f"No pages in {source}")
+    print(f"{len(catalogue_pages)} catalogue pages, {len(assessment_pages)} assessment pages")
+
+    configurations = [("html.parser", False), ("html.parser", True)]
+    if lxml_available():
+        configurations += [("lxml", False), ("lxml", True)]
+    else:
+        print("lxml is not installed, benchmarking html.parser only")
+
+    baseline_records = None
+    baseline_seconds = None
+    for parser_name, parse_only in configurations:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            records = extract(parser_name, parse_only, catalogue_pages, assessment_pages)
+            best = min(best, time.perf_counter() - start)
+
+        if baseline_records is None:
+            baseline_records, baseline_seconds = records, best
+        elif records != baseline_records:
+            raise SystemExit(f"{parser_name} (parse_only={parse_only}) extracted different records than the baseline")
+
+        print(
+            f"{parser_name:<12} parse_only={str(parse_only):<5}  "
+            f"{best * 1000 / total_pages:8.2f} ms/page  {baseline_seconds / best:5.2f}x  "  # type: ignore
+            f"{len(records)} identical records"
+        )
+
+
+if __name__ == "__main__":
+    main()
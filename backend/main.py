@@ -3,8 +3,8 @@ import sys
 from app.utils.config import load_config
 
 
-def run_ingestion(config: dict):
-    """Run the data ingestion pipeline"""
+def build_ingester(config: dict, start_fresh: bool = False):
+    """Build the data ingester from config.json settings"""
     from app.services.ingester.data_ingester import DataIngester
     from app.services.scraper.assessment_scraper import AssessmentScraper
     from app.services.scraper.catalogue_scraper import CatalogueScraper
@@ -29,19 +29,35 @@ def run_ingestion(config: dict):
         text_splitter=text_splitter,
         start_from_batch=config.get("DATA_INGESTION_START_FROM_BATCH", 0),
         end_at=config.get("DATA_INGESTION_END_AT", 372),
-        start_fresh=config.get("DATA_INGESTION_START_FRESH", False),
+        start_fresh=start_fresh or config.get("DATA_INGESTION_START_FRESH", False),
         total_batches=config.get("DATA_INGESTION_TOTAL_BATCHES", 31),
         batch_size=config.get("DATA_INGESTION_BATCH_SIZE", 12)
     )
-    
-    ingester.ingest_data()
+    return ingester
+
+
+def run_ingestion(config: dict):
+    """Run the data ingestion pipeline"""
+    build_ingester(config).ingest_data()
     print("Data ingestion completed successfully!")
 
 
+def run_snapshot_ingestion(config: dict, rebuild: bool):
+    """Index the catalogue snapshot into the vector store, without scraping"""
+    build_ingester(config, start_fresh=rebuild).ingest_snapshot()
+    print("Snapshot ingestion completed successfully!")
+
+
 def main():
     config = load_config()
     cmd_args = sys.argv[1:]
     
+    if cmd_args and cmd_args[0] == "ingest-snapshot":
+        # Offline re-index, `--rebuild` clears the vector store first (e.g. after an embedding or splitter change)
+        print("Snapshot ingestion mode")
+        run_snapshot_ingestion(config, rebuild="--rebuild" in cmd_args)
+        return
+    
     # Run data ingestion only if the flag is enabled
     if config.get("DATA_INGESTION", False):
         print("Starting data ingestion...")
@@ -56,16 +72,21 @@ def main():
         from app.evaluation.evaluator import Evaluator
         from app.services.balancer.balancer import ResultBalancer
         from app.services.llm.factory import get_llm
+        from app.services.query.query_cache import get_query_cache
         from app.services.query.query_transformer import QueryTransformer
+        from app.services.recommender.candidate_budget import CandidateBudget
         from app.services.retriever.factory import get_retriever
         from app.services.reranker.factory import get_reranker
+        from app.utils.envs import Envs
         
         evaluator = Evaluator(
             retriever=get_retriever(),
             reranker=get_reranker(),
             balancer=ResultBalancer(),
-            query_transformer=QueryTransformer(llm=get_llm()),
-            dataset_file="app/evaluation/dataset.xlsx"
+            query_transformer=QueryTransformer(llm=get_llm(), cache=get_query_cache()),
+            dataset_file="app/evaluation/dataset.xlsx",
+            # Same gate as the API, the comparison reranks every query twice
+            candidate_budget=CandidateBudget() if Envs.ADAPTIVE_CANDIDATES else None
         )
         evaluator.evaluate_all()
     elif cmd_args and cmd_args[0] == "testset":
@@ -74,6 +95,7 @@ def main():
         from app.evaluation.test_set_recommendation import TestSetRecommendation
         from app.services.balancer.balancer import ResultBalancer
         from app.services.llm.factory import get_llm
+        from app.services.query.query_cache import get_query_cache
         from app.services.query.query_transformer import QueryTransformer
         from app.services.retriever.factory import get_retriever
         from app.services.reranker.factory import get_reranker
@@ -82,7 +104,7 @@ def main():
             retriever=get_retriever(),
             reranker=get_reranker(),
             balancer=ResultBalancer(),
-            query_transformer=QueryTransformer(llm=get_llm()),
+            query_transformer=QueryTransformer(llm=get_llm(), cache=get_query_cache()),
             dataset_file="app/evaluation/dataset.xlsx",
             results_file="test_set_predictions.csv"
         )
@@ -91,9 +113,11 @@ def main():
         print("Serve mode")
         # start the fastapi server
         import uvicorn
-        from app.services.api.main import app
+        from app.utils.envs import Envs
         
-        uvicorn.run(app, host="0.0.0.0", port=8000)
+        # Workers are separate processes, so uvicorn needs the app as an import string.
+        # With VECTOR_STORE=local they share the memory-mapped snapshot via the page cache.
+        uvicorn.run("app.services.api.main:app", host="0.0.0.0", port=8000, workers=Envs.API_WORKERS)
     
 
 if __name__ == "__main__":